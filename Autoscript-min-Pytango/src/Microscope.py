@@ -7,27 +7,53 @@ so that each detector device is the single source of truth for its own params.
 
 Return convention for image commands
 -------------------------------------
-All image commands return DevEncoded = (str, bytes) where:
-  - str  : JSON string containing metadata (shape, dtype, dwell_time, …)
-  - bytes: raw numpy array bytes (reconstruct with np.frombuffer + reshape)
+get_<detector>_image (e.g. get_haadf_image), get_image and
+get_images_batch return DevEncoded = (str, bytes) where:
+  - str  : IMAGE_FORMAT, identifying the payload layout
+  - bytes: fixed-layout binary HEADER (shape, dtype, dwell_time, …)
+           followed by the raw numpy array bytes
 
-Client-side reconstruction example::
+The header is packed with ``struct`` rather than JSON so neither side has
+to run a text parser per image. It cannot travel in the DevEncoded format
+string because Tango transports that as a C string (truncated at NUL).
 
-    import json, numpy as np
-    encoded = proxy.get_haadf_image()   # returns (json_str, raw_bytes)
-    meta    = json.loads(encoded[0])
-    image   = np.frombuffer(encoded[1], dtype=meta["dtype"]).reshape(meta["shape"])
+Client-side reconstruction — use Microscope.decode, which views the
+pixels in place rather than copying them::
+
+    from src.Microscope import Microscope, decode_header
+
+    encoded = proxy.get_haadf_image()      # (IMAGE_FORMAT, header + raw_bytes)
+    image   = Microscope.decode(encoded)   # (height, width) ndarray
+    header  = decode_header(encoded[1])    # dwell_time, timestamp, detector, …
+
+For get_images_batch decode returns a (frames, height, width) stack.
+
+Clients on the same host can use get_image_shm instead, which leaves the
+header + pixels in a shared-memory segment and returns only its name and
+a sequence number (see SHM_DESCRIPTOR).
 """
 
+import collections
+import functools
 import json
+import struct
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, Optional
 
 import numpy as np
 import tango
-from tango import AttrWriteType, DevEncoded, DevState
+from tango import AttrWriteType, DevEncoded, DevState, DevVarLongStringArray
 from tango.server import Device, attribute, command, device_property
 
+try:
+    from src.detectors.settings_store import DetectorSettingsStore
+except ImportError:  # run as a script from src/
+    from detectors.settings_store import DetectorSettingsStore
+
 # AutoScript imports — only available on the microscope PC.
 # Wrapped in try/except so the device can still be imported and tested
 # on a development machine without AutoScript installed.
@@ -40,6 +66,199 @@ except ImportError:
 
 print(_AUTOSCRIPT_AVAILABLE)
 
+# LZ4 is optional — image payloads are sent uncompressed without it
+try:
+    import lz4.block
+    _LZ4_AVAILABLE = True
+except ImportError:
+    _LZ4_AVAILABLE = False
+
+# orjson is optional — a faster encoder for the JSON metadata commands
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+
+
+def _json_dumps(obj: object) -> str:
+    """Serialise metadata to a JSON string, with orjson when installed."""
+    if _ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj)
+
+# Numba is optional — simulated frames are generated with NumPy without it
+try:
+    import numba
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+if _NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, cache=True)
+    def _fill_random_u16(buf, seed):
+        """Fill a 2-D uint16 buffer with xorshift64 noise, one row per thread."""
+        rows, cols = buf.shape
+        for row in numba.prange(rows):
+            # splitmix64 scramble so neighbouring rows get unrelated streams
+            state = np.uint64(seed) ^ np.uint64(row)
+            state = (state + np.uint64(0x9E3779B97F4A7C15)) * np.uint64(0xBF58476D1CE4E5B9)
+            state = (state ^ (state >> np.uint64(31))) | np.uint64(1)
+            for col in range(cols):
+                state ^= state << np.uint64(13)
+                state ^= state >> np.uint64(7)
+                state ^= state << np.uint64(17)
+                buf[row, col] = np.uint16(state >> np.uint64(48))
+
+# ----------------------------------------------------------------------
+# Image wire format
+# ----------------------------------------------------------------------
+
+# DevEncoded format string for a header-prefixed image payload
+IMAGE_FORMAT = "stem_image"
+
+# version, dtype code, frames, height, width, ndim, dwell_time, timestamp, detector name,
+# padded to 48 bytes so the pixels that follow are 8-byte aligned
+HEADER = struct.Struct("<BBHHHHdd16s6x")
+HEADER_VERSION = 3
+
+# The one header field that changes on every acquisition
+_TIMESTAMP = struct.Struct("<d")
+_TIMESTAMP_OFFSET = struct.calcsize("<BBHHHHd")
+
+# Payload codec, carried in the top bit of the version byte
+CODEC_NONE = 0x00
+CODEC_LZ4 = 0x80
+_CODEC_MASK = 0x80
+
+# image_compression attribute value → codec
+_COMPRESSION_CODECS: dict[str, int] = {"none": CODEC_NONE, "lz4": CODEC_LZ4}
+
+DTYPE_U8 = 1
+DTYPE_U16 = 2
+DTYPE_U32 = 3
+DTYPE_F32 = 4
+DTYPE_I8 = 5
+DTYPE_I16 = 6
+DTYPE_I32 = 7
+DTYPE_F64 = 8
+
+_DTYPE_CODES: dict[np.dtype, int] = {
+    np.dtype(np.uint8): DTYPE_U8,
+    np.dtype(np.uint16): DTYPE_U16,
+    np.dtype(np.uint32): DTYPE_U32,
+    np.dtype(np.float32): DTYPE_F32,
+    np.dtype(np.int8): DTYPE_I8,
+    np.dtype(np.int16): DTYPE_I16,
+    np.dtype(np.int32): DTYPE_I32,
+    np.dtype(np.float64): DTYPE_F64,
+}
+_CODE_DTYPES: dict[int, np.dtype] = {code: dtype for dtype, code in _DTYPE_CODES.items()}
+
+# Shared-memory image ring (get_image_shm). Each segment holds a sequence
+# number, then the same HEADER + pixels layout as a get_image payload.
+# The command returns SHM_DESCRIPTOR = (sequence number, segment name).
+IMAGE_SHM_FORMAT = "stem_image_shm"
+SHM_DESCRIPTOR = struct.Struct("<Q32s")
+SHM_SEQ = struct.Struct("<Q")
+SHM_HEADER_OFFSET = SHM_SEQ.size
+_SHM_RING_SLOTS = 4
+
+# Acquisition settings every detector settings device exposes
+_DETECTOR_SETTINGS: tuple[str, ...] = ("dwell_time", "image_width", "image_height", "bit_depth")
+
+# Simulated pixel dtype per detector bit_depth setting
+_BIT_DEPTH_DTYPES: dict[int, np.dtype] = {8: np.dtype(np.uint8), 16: np.dtype(np.uint16)}
+
+def _detector_type(name: str) -> Optional[object]:
+    """AutoScript DetectorType member for a detector name, or None if there is none."""
+    if not _AUTOSCRIPT_AVAILABLE:
+        return None
+    return getattr(DetectorType, name.upper(), None)
+
+
+def _new_frame(shape: tuple[int, ...], dtype: np.dtype) -> tuple[bytearray, np.ndarray]:
+    """Allocate a HEADER + pixels bytearray and a writable view of its pixels."""
+    dtype = np.dtype(dtype)
+    frame = bytearray(HEADER.size + int(np.prod(shape)) * dtype.itemsize)
+    pixels = np.frombuffer(frame, dtype=dtype, offset=HEADER.size).reshape(shape)
+    return frame, pixels
+
+
+# Longest get_image waits for the background acquisition loop to deliver a frame
+_RING_TIMEOUT_S = 60.0
+
+# Oldest wall-clock sample timestamp_precision='coarse' will reuse
+_COARSE_CLOCK_NS = 1_000_000
+
+# Largest get_images_batch payload, in pixel bytes
+_BATCH_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _detector_image_command(name: str) -> Callable:
+    """
+    Build a get_<name>_image command with the detector name baked in.
+
+    The handler it calls is bound per connection in _connect_detector_proxies;
+    the command itself skips get_image's name parsing and normalisation.
+    """
+    def get_detector_image(self) -> tuple[str, bytes]:
+        handler = self._handlers.get(name)
+        if handler is None:
+            tango.Except.throw_exception(
+                "UnknownDetector",
+                f"Detector '{name}' is not connected",
+                f"Microscope.get_{name}_image()",
+            )
+        return handler()
+
+    # Tango names the command after the function, so rename before decorating
+    get_detector_image.__name__ = get_detector_image.__qualname__ = f"get_{name}_image"
+    get_detector_image.__doc__ = (
+        f"Acquire a single STEM image from the {name} detector.\n\n"
+        "Returns the same DevEncoded (IMAGE_FORMAT, header + raw_bytes) as get_image."
+    )
+    return command(dtype_out=DevEncoded)(get_detector_image)
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    """Decoded form of the binary HEADER at the start of an image payload."""
+
+    version: int
+    codec: int
+    dtype: np.dtype
+    frames: int
+    height: int
+    width: int
+    ndim: int
+    dwell_time: float
+    timestamp: float
+    detector: str
+
+
+def decode_header(data: bytes) -> ImageHeader:
+    """
+    Decode the HEADER at the start of a get_image payload.
+
+    Pixel bytes follow the header at offset HEADER.size — LZ4 block
+    compressed (lz4.block.decompress) when codec is CODEC_LZ4.
+    """
+    version, code, frames, height, width, ndim, dwell_time, timestamp, detector = HEADER.unpack_from(data)
+    return ImageHeader(
+        version=version & ~_CODEC_MASK,
+        codec=version & _CODEC_MASK,
+        dtype=_CODE_DTYPES[code],
+        frames=frames,
+        height=height,
+        width=width,
+        ndim=ndim,
+        dwell_time=dwell_time,
+        timestamp=timestamp,
+        detector=detector.rstrip(b"\0").decode(),
+    )
+
+
 class Microscope(Device):
     """
     Top-level TEM microscope device.
@@ -78,6 +297,41 @@ class Microscope(Device):
             "No-DB mode: 'tango://127.0.0.1:8888/test/nodb/advancedacquisition#dbase=no'",
 )
 
+    continuous_acquisition_detector = device_property(
+        dtype=str,
+        default_value="",
+        doc="Detector to free-run in a background acquisition thread, e.g. 'haadf'. "
+            "get_image on that detector then returns the latest finished frame "
+            "instead of acquiring on the Tango command thread. Empty disables it. "
+            "Only used with a live AutoScript connection — the beam keeps scanning.",
+    )
+
+    timestamp_precision = device_property(
+        dtype=str,
+        default_value="exact",
+        doc="'exact': stamp each image with time.time() when it is acquired. "
+            "'coarse': reuse a wall-clock sample for up to ~1 ms, refreshing it "
+            "lazily from time.monotonic_ns() when an image is stamped.",
+    )
+
+    settings_store_name = device_property(
+        dtype=str,
+        default_value="",
+        doc="Name of the shared-memory DetectorSettingsStore the detector devices "
+            "publish to (their settings_store_name). When set, detector settings "
+            "are read from it locally; detectors not publishing fall back to "
+            "DeviceProxy reads. Only valid when all devices share one host",
+    )
+
+    cache_detector_settings = device_property(
+        dtype=bool,
+        default_value=False,
+        doc="Cache detector settings and keep them current through the detectors' "
+            "change events, instead of reading them on every acquisition. Events "
+            "arrive asynchronously, so a setting written just before an "
+            "acquisition may not apply to it yet. False (default) reads through",
+    )
+
     # Add further detector device_property entries here as detectors are added
     # eds_device_address   = device_property(dtype=str, default_value="test/detector/eds")
     # eels_device_address  = device_property(dtype=str, default_value="test/detector/eels")
@@ -93,6 +347,14 @@ class Microscope(Device):
         doc="True when the microscope is in STEM mode",
     )
 
+    image_compression = attribute(
+        label="Image Compression",
+        dtype=str,
+        access=AttrWriteType.READ_WRITE,
+        doc="Codec for get_image pixel payloads: 'none' or 'lz4'. "
+            "LZ4 trades server CPU for network bandwidth on large frames.",
+    )
+
     # ------------------------------------------------------------------
     # Initialisation
     # ------------------------------------------------------------------
@@ -103,17 +365,98 @@ class Microscope(Device):
 
         self._microscope: Optional[object] = None  # TemMicroscopeClient instance
         self._stem_mode: bool = False
+        self._compression: str = "none"
 
         # Dict mapping detector name string → DeviceProxy
         # Populated in _connect_detector_proxies
         self._detector_proxies: dict[str, tango.DeviceProxy] = {}
 
+        # Detector name → bound acquire-and-encode handler, built once per
+        # connection so get_image dispatches with a single dict lookup.
+        # Also keyed by the common spellings ("HAADF", "Haadf") of each name.
+        self._handlers: dict[str, Callable[[], tuple[str, bytearray]]] = {}
+
+        # Detector name → {setting name → value}, kept current by CHANGE_EVENT
+        # subscriptions so get_image does not re-read settings over Tango
+        # (cache_detector_settings only). An entry only exists while its
+        # subscription is healthy.
+        self._settings_cache: dict[str, dict[str, object]] = {}
+        # Detector name → event ids of its settings subscriptions
+        self._settings_subscriptions: dict[str, list[int]] = {}
+        # Detectors that refused a subscription; read per call until reconnect
+        self._settings_unsubscribable: set[str] = set()
+
+        # Shared-memory settings published by co-located detector devices;
+        # consulted before the change-event cache and DeviceProxy reads
+        self._settings_store: Optional[DetectorSettingsStore] = None
+        if self.settings_store_name:
+            self._settings_store = DetectorSettingsStore(self.settings_store_name)
+
+        # One RNG for the device lifetime (simulation mode)
+        self._rng = np.random.default_rng()
+
+        # Reusable wire buffer per detector: a bytearray holding HEADER +
+        # pixels, and a writable ndarray view of the pixels, stored with the
+        # (height, width, dtype) they were made for. Acquisition writes
+        # straight into the view, so get_image can hand the bytearray to
+        # Tango without an intermediate tobytes() copy.
+        self._frames: dict[str, tuple[tuple[int, int, np.dtype], tuple[bytearray, np.ndarray]]] = {}
+
+        # Detector name → (fields key, packed HEADER with a zero timestamp).
+        # Reused while shape, dtype, dwell time and codec are unchanged; only
+        # the timestamp is patched per acquisition.
+        self._header_templates: dict[str, tuple[tuple, bytes]] = {}
+
+        # get_image_shm ring: segments are created on first use and regrown
+        # when a frame outgrows them; sequence numbers start at 1 (0 = being written)
+        self._shm_ring: list[Optional[shared_memory.SharedMemory]] = [None] * _SHM_RING_SLOTS
+        self._shm_next: int = 0
+        self._shm_seq: int = 0
+
+        # AutoScript drives one scan at a time — serialise acquisitions
+        self._autoscript_lock = threading.Lock()
+
+        # Background acquisition (continuous_acquisition_detector): the loop
+        # appends (image, dwell_time, acquisition timestamp) to the ring,
+        # get_image takes the newest
+        self._ring: collections.deque[tuple[np.ndarray, float, float]] = collections.deque(maxlen=4)
+        self._ring_cond = threading.Condition()
+        self._acq_stop = threading.Event()
+        self._acq_thread: Optional[threading.Thread] = None
+        self._acq_detector: Optional[str] = None
+
+        # Image timestamp source — see timestamp_precision
+        self._wall_now: float = time.time()
+        self._wall_sampled_ns: int = time.monotonic_ns()
+        self._clock: Callable[[], float] = time.time
+        if self.timestamp_precision.lower().strip() == "coarse":
+            self._clock = self._coarse_now
+
         self._connect()
 
+    def delete_device(self) -> None:
+        self._stop_acquisition_loop()
+        self._unsubscribe_settings()
+        self._release_shm_ring()
+        if self._settings_store is not None:
+            self._settings_store.close()
+            self._settings_store = None
+        Device.delete_device(self)
+
+    def _coarse_now(self) -> float:
+        """Return a wall-clock sample that is at most ~1 ms old."""
+        now_ns = time.monotonic_ns()
+        if now_ns - self._wall_sampled_ns >= _COARSE_CLOCK_NS:
+            self._wall_sampled_ns = now_ns
+            self._wall_now = time.time()
+        return self._wall_now
+
     def _connect(self) -> None:
         """Connect to AutoScript and set up detector proxies."""
+        self._stop_acquisition_loop()
         self._connect_autoscript()
         self._connect_detector_proxies()
+        self._start_acquisition_loop()
         self.set_state(DevState.ON)
 
     def _connect_autoscript(self) -> None:
@@ -139,13 +482,191 @@ class Microscope(Device):
             # "BF"
             # "eds":  self.eds_device_address,
         }
-        for name, address in addresses.items():
+        self._unsubscribe_settings()
+        # Each DeviceProxy resolves its device over the network; open them
+        # concurrently so startup waits for the slowest, not the sum
+        with ThreadPoolExecutor(max_workers=len(addresses)) as executor:
+            futures = {name: executor.submit(self._open_proxy, address) for name, address in addresses.items()}
+        for name, future in futures.items():
+            address = addresses[name]
             try:
-                self._detector_proxies[name] = tango.DeviceProxy(address)
+                self._detector_proxies[name] = future.result()
                 self.info_stream(f"Connected to detector proxy: {name} @ {address}")
             except tango.DevFailed as e:
                 self.error_stream(f"Failed to connect to {name} proxy at {address}: {e}")
 
+        self._handlers = {}
+        for name, proxy in self._detector_proxies.items():
+            if name == "AdvancedAcquistion":  # settings-only device, not an image source
+                continue
+            handler = self._make_handler(name, proxy)
+            for alias in (name, name.upper(), name.capitalize()):
+                self._handlers[alias] = handler
+
+    @staticmethod
+    def _open_proxy(address: str) -> tango.DeviceProxy:
+        proxy = tango.DeviceProxy(address)
+        # Serve reads from the detector's polling buffer when the
+        # attribute is polled; falls through to the device otherwise
+        proxy.set_source(tango.DevSource.CACHE_DEV)
+        return proxy
+
+    def _detector_names(self) -> list[str]:
+        """Canonical detector names, without the case aliases in _handlers."""
+        return list(dict.fromkeys(name.lower() for name in self._handlers))
+
+    def _make_handler(self, name: str, proxy: tango.DeviceProxy) -> Callable[[], tuple[str, bytearray]]:
+        """Bind proxy and AutoScript detector enum for one detector's get_image."""
+        return functools.partial(self._acquire_and_encode, name, proxy, _detector_type(name))
+
+    # ------------------------------------------------------------------
+    # Detector settings cache
+    # ------------------------------------------------------------------
+
+    def _detector_settings(self, name: str, proxy: tango.DeviceProxy) -> dict[str, object]:
+        """
+        Return the acquisition settings of a detector.
+
+        Served from the shared settings store when the detector publishes
+        to one; otherwise read in one round-trip. With cache_detector_settings
+        the read settings are cached, and kept current by the detector's
+        change events, for subsequent calls.
+        """
+        if self._settings_store is not None:
+            settings = self._settings_store.get(name)
+            if settings is not None:
+                return settings
+
+        settings = self._settings_cache.get(name)
+        if settings is not None:
+            return settings
+
+        settings = {attr.name: attr.value for attr in proxy.read_attributes(list(_DETECTOR_SETTINGS))}
+        if not self.cache_detector_settings or name in self._settings_unsubscribable:
+            return settings
+        # Seed the cache before subscribing: the first event of each
+        # subscription arrives synchronously and carries any write made
+        # since the read above
+        self._settings_cache[name] = settings
+        if not self._subscribe_settings(name, proxy):
+            self._settings_cache.pop(name, None)
+        return settings
+
+    def _subscribe_settings(self, name: str, proxy: tango.DeviceProxy) -> bool:
+        """Subscribe to CHANGE_EVENT on a detector's settings, once per proxy."""
+        if name in self._settings_subscriptions:
+            return True
+        callback = functools.partial(self._on_setting_changed, name)
+        event_ids: list[int] = []
+        try:
+            for attr_name in _DETECTOR_SETTINGS:
+                event_ids.append(
+                    proxy.subscribe_event(attr_name, tango.EventType.CHANGE_EVENT, callback)
+                )
+        except tango.DevFailed as e:
+            # Detector does not push change events — fall back to reading per call
+            self.warn_stream(f"Cannot subscribe to {name} settings, reading them per acquisition: {e}")
+            for event_id in event_ids:
+                proxy.unsubscribe_event(event_id)
+            self._settings_unsubscribable.add(name)
+            return False
+        self._settings_subscriptions[name] = event_ids
+        return True
+
+    def _unsubscribe_settings(self) -> None:
+        """Drop every settings subscription and the values they maintained."""
+        for name, event_ids in self._settings_subscriptions.items():
+            proxy = self._detector_proxies.get(name)
+            for event_id in event_ids:
+                try:
+                    proxy.unsubscribe_event(event_id)
+                except tango.DevFailed:
+                    pass
+        self._settings_subscriptions.clear()
+        self._settings_cache.clear()
+        self._settings_unsubscribable.clear()
+
+    def _on_setting_changed(self, name: str, event: tango.EventData) -> None:
+        """CHANGE_EVENT callback — keep the cached settings of one detector current."""
+        if event.err:
+            # Connection lost: stop trusting the cache until the next read-through
+            self._settings_cache.pop(name, None)
+            return
+        settings = self._settings_cache.get(name)
+        if settings is not None:
+            settings[event.attr_value.name] = event.attr_value.value
+
+
+    # ------------------------------------------------------------------
+    # Background acquisition
+    # ------------------------------------------------------------------
+
+    def _start_acquisition_loop(self) -> None:
+        """Start free-running acquisition if configured and AutoScript is live."""
+        name = (self.continuous_acquisition_detector or "").lower().strip()
+        if not name or self._microscope is None:
+            return
+        if name not in self._handlers:
+            self.error_stream(f"Cannot free-run '{name}': no detector with that name")
+            return
+        self._acq_stop.clear()
+        self._acq_detector = name
+        self._acq_thread = threading.Thread(
+            target=self._acq_loop, args=(name,), name=f"{name}-acquisition", daemon=True
+        )
+        self._acq_thread.start()
+        self.info_stream(f"Free-running acquisition started for {name}")
+
+    def _stop_acquisition_loop(self) -> None:
+        """Stop the acquisition thread, if any, and drop undelivered frames."""
+        if self._acq_thread is None:
+            return
+        self._acq_stop.set()
+        self._acq_thread.join()
+        self._acq_thread = None
+        self._acq_detector = None
+        with self._ring_cond:
+            self._ring.clear()
+
+    def _acq_loop(self, name: str) -> None:
+        """Producer: acquire frames back-to-back and publish them to the ring."""
+        proxy = self._detector_proxies[name]
+        detector_type = _detector_type(name)
+        while not self._acq_stop.is_set():
+            try:
+                settings = self._detector_settings(name, proxy)
+                dwell_time = settings["dwell_time"]
+                image = self._acquire_stem_image(
+                    name,
+                    detector_type,
+                    settings["image_width"],
+                    settings["image_height"],
+                    dwell_time,
+                    settings["bit_depth"],
+                )
+                acquired_at = self._clock()
+            except Exception as e:
+                self.error_stream(f"Background acquisition on {name} failed: {e}")
+                self._acq_stop.wait(1.0)
+                continue
+            with self._ring_cond:
+                self._ring.append((image, dwell_time, acquired_at))
+                self._ring_cond.notify_all()
+
+    def _latest_frame(self) -> tuple[np.ndarray, float, float]:
+        """Consumer: take the newest frame from the ring, waiting for one if empty."""
+        with self._ring_cond:
+            if not self._ring_cond.wait_for(lambda: self._ring, timeout=_RING_TIMEOUT_S):
+                tango.Except.throw_exception(
+                    "AcquisitionTimeout",
+                    f"No frame from the {self._acq_detector} acquisition loop "
+                    f"within {_RING_TIMEOUT_S}s",
+                    "Microscope.get_image()",
+                )
+            frame = self._ring.pop()
+            # Older frames are stale once a newer one has been delivered
+            self._ring.clear()
+        return frame
 
     # ------------------------------------------------------------------
     # Attribute read methods
@@ -155,6 +676,25 @@ class Microscope(Device):
         # TODO: query self._microscope.optics.mode when AutoScript available
         return self._stem_mode
 
+    def read_image_compression(self) -> str:
+        return self._compression
+
+    def write_image_compression(self, value: str) -> None:
+        value = value.lower().strip()
+        if value not in _COMPRESSION_CODECS:
+            tango.Except.throw_exception(
+                "InvalidCompression",
+                f"Unknown compression '{value}'. Available: {list(_COMPRESSION_CODECS)}",
+                "Microscope.write_image_compression()",
+            )
+        if value == "lz4" and not _LZ4_AVAILABLE:
+            tango.Except.throw_exception(
+                "CompressionUnavailable",
+                "LZ4 compression requires the 'lz4' package",
+                "Microscope.write_image_compression()",
+            )
+        self._compression = value
+
     # ------------------------------------------------------------------
     # Commands
     # ------------------------------------------------------------------
@@ -167,60 +707,167 @@ class Microscope(Device):
     @command
     def Disconnect(self) -> None:
         """Disconnect from AutoScript gracefully."""
+        self._stop_acquisition_loop()
         # TODO: self._microscope.disconnect() when AutoScript available
         self._microscope = None
         self.set_state(DevState.OFF)
         self.info_stream("Disconnected from AutoScript")
 
+    # One argument-free command per image detector, e.g. get_haadf_image()
+    get_haadf_image = _detector_image_command("haadf")
+    # get_eds_image = _detector_image_command("eds")
+
     @command(dtype_in=str, dtype_out=DevEncoded)#In PyTango, DevEncoded is a special Tango data type designed to send binary data + a small description string together as a single return value.
     def get_image(self, detector_name: str) -> tuple[str, bytes]:
         """
         Acquire a single STEM image from the named detector.
 
+        Deprecated: prefer the per-detector commands (get_haadf_image, …),
+        which skip the name lookup. Kept for existing clients.
+
         Parameters
         ----------
         detector_name:
             Name of the detector, e.g. "haadf". Must match a key in
-            self._detector_proxies.
+            self._handlers.
 
         Returns
         -------
-        DevEncoded = (json_metadata, raw_bytes)
-            json_metadata includes: shape, dtype, dwell_time, detector,
-            timestamp, and any other relevant metadata.
-            raw_bytes is the flat numpy array bytes; reshape using shape from metadata.
+        DevEncoded = (IMAGE_FORMAT, header + raw_bytes)
+            header is HEADER-packed: dtype, height, width, ndim, dwell_time,
+            timestamp and detector name. Decode it with decode_header();
+            raw_bytes starts at offset HEADER.size and is the flat numpy array,
+            LZ4-compressed when image_compression is 'lz4' (see header.codec).
         """
-        detector_name = detector_name.lower().strip()
-
-        proxy = self._detector_proxies.get(detector_name)
-        if proxy is None:
+        # Exact spellings are registered up front; only odd ones pay for normalising
+        handler = self._handlers.get(detector_name) or self._handlers.get(detector_name.lower().strip())
+        if handler is None:
             tango.Except.throw_exception(
                 "UnknownDetector",
                 f"No proxy found for detector '{detector_name}'. "
-                f"Available: {list(self._detector_proxies.keys())}",
+                f"Available: {self._detector_names()}",
                 "Microscope.get_image()",
             )
+        return handler()
 
-        # Read acquisition settings from the detector device
-        dwell_time: float = proxy.dwell_time
-        width: int  = proxy.image_width
-        height: int = proxy.image_height
+    @command(dtype_in=DevVarLongStringArray, dtype_out=DevEncoded)
+    def get_images_batch(self, args: tuple[list[int], list[str]]) -> tuple[str, bytes]:
+        """
+        Acquire n consecutive frames from one detector in a single call.
 
-        # TODO: map (width, height) → AutoScript ImageSize enum
-        # e.g. ImageSize.PRESET_1024 when width == height == 1024
+        Parameters
+        ----------
+        args:
+            DevVarLongStringArray ([n], [detector_name]), e.g. ([10], ["haadf"]).
+
+        Returns
+        -------
+        DevEncoded = (IMAGE_FORMAT, header + raw_bytes)
+            Same layout as get_image with header.frames == n and
+            header.ndim == 3; reshape to (frames, height, width).
+
+        The call lasts n acquisitions — raise the client timeout
+        (DeviceProxy.set_timeout_millis) accordingly. Every frame uses the
+        detector settings read at the start of the call, and the stack may
+        hold at most _BATCH_MAX_BYTES of pixels.
+        """
+        counts, names = args
+        if len(counts) != 1 or len(names) != 1:
+            tango.Except.throw_exception(
+                "InvalidArgument",
+                f"Expected ([n], [detector_name]), got {len(counts)} counts and {len(names)} names",
+                "Microscope.get_images_batch()",
+            )
+        n, detector_name = int(counts[0]), names[0]
+        name = detector_name.lower().strip()
+        if name not in self._handlers:
+            tango.Except.throw_exception(
+                "UnknownDetector",
+                f"No proxy found for detector '{detector_name}'. "
+                f"Available: {self._detector_names()}",
+                "Microscope.get_images_batch()",
+            )
+        if not 1 <= n <= 0xFFFF:
+            tango.Except.throw_exception(
+                "InvalidFrameCount",
+                f"Frame count must be between 1 and 65535, got {n}",
+                "Microscope.get_images_batch()",
+            )
 
-        adorned_image = self._acquire_stem_image(detector_name, width, height, dwell_time)
+        proxy = self._detector_proxies[name]
+        detector_type = _detector_type(name)
+        # A copy: the cached settings dict is updated in place by change events
+        settings = dict(self._detector_settings(name, proxy))
+        self._check_batch_size(
+            n, settings["image_height"] * settings["image_width"] * _BIT_DEPTH_DTYPES[settings["bit_depth"]].itemsize
+        )
 
-        metadata = {
-            "detector": detector_name,
-            "shape": [height, width],
-            "dtype": str(adorned_image.dtype),
-            "dwell_time": dwell_time,
-            "timestamp": time.time(),
-            # TODO: add metadata from adorned_image.metadata when using real AutoScript
-        }
+        first, dwell_time, acquired_at = self._acquire_one(name, proxy, detector_type, settings=settings)
+        # AutoScript frames need not match the requested size; size the stack on the real one
+        self._check_batch_size(n, first.nbytes)
+        frame, pixels = _new_frame((n, *first.shape), first.dtype)
+        pixels[0] = first
+        for i in range(1, n):
+            out = pixels[i]
+            image, _, _ = self._acquire_one(name, proxy, detector_type, out, settings)
+            if image is out:
+                continue
+            if image.shape != out.shape or image.dtype != out.dtype:
+                tango.Except.throw_exception(
+                    "FrameMismatch",
+                    f"Frame {i} of the batch is {image.shape} {image.dtype}, "
+                    f"expected {out.shape} {out.dtype}",
+                    "Microscope.get_images_batch()",
+                )
+            out[...] = image
+
+        # Stamped with the first frame's acquisition time
+        return self._encode(name, frame, pixels, dwell_time, acquired_at)
+
+    @command(dtype_in=str, dtype_out=DevEncoded)
+    def get_image_shm(self, detector_name: str) -> tuple[str, bytes]:
+        """
+        Acquire a single STEM image into shared memory, for clients on this host.
+
+        Returns
+        -------
+        DevEncoded = (IMAGE_SHM_FORMAT, SHM_DESCRIPTOR-packed (seq, segment name))
+            The segment holds SHM_SEQ, then the get_image HEADER at
+            SHM_HEADER_OFFSET, then the uncompressed pixels. It is reused
+            _SHM_RING_SLOTS calls later: when its SHM_SEQ no longer equals
+            seq, the frame has been overwritten.
+
+        Remote clients should keep using get_image.
+        """
+        name = detector_name.lower().strip()
+        if name not in self._handlers:
+            tango.Except.throw_exception(
+                "UnknownDetector",
+                f"No proxy found for detector '{detector_name}'. "
+                f"Available: {self._detector_names()}",
+                "Microscope.get_image_shm()",
+            )
+        proxy = self._detector_proxies[name]
 
-        return json.dumps(metadata), adorned_image.tobytes()
+        # Size the segment from a copy of the current settings and acquire
+        # straight into it with the same settings
+        settings = dict(self._detector_settings(name, proxy))
+        shape = (settings["image_height"], settings["image_width"])
+        dtype = _BIT_DEPTH_DTYPES[settings["bit_depth"]]
+        shm, pixels = self._shm_frame(shape, dtype)
+        image, dwell_time, acquired_at = self._acquire_one(name, proxy, _detector_type(name), pixels, settings)
+        if image is not pixels:
+            if image.shape != pixels.shape or image.dtype != pixels.dtype:
+                # AutoScript returned another size; drop the view so the slot can be regrown
+                del pixels
+                shm, pixels = self._shm_frame(image.shape, image.dtype)
+            np.copyto(pixels, image)
+
+        self._write_header(name, shm.buf[SHM_HEADER_OFFSET:], pixels, dwell_time, CODEC_NONE, acquired_at)
+        self._shm_seq += 1
+        SHM_SEQ.pack_into(shm.buf, 0, self._shm_seq)
+        self._shm_next = (self._shm_next + 1) % _SHM_RING_SLOTS
+        return IMAGE_SHM_FORMAT, SHM_DESCRIPTOR.pack(self._shm_seq, shm.name.encode())
 
     @command(dtype_in=('str',), dtype_out=str)
     def get_images(self, detector_names: list[str]) -> str:
@@ -249,10 +896,12 @@ class Microscope(Device):
         
         # Get settings from AdvancedAcquisition device
         adv_acq_proxy = self._detector_proxies.get("AdvancedAcquistion")
-        dwell_time = adv_acq_proxy.dwell_time
-        base_resolution = adv_acq_proxy.base_resolution
-        scan_region = adv_acq_proxy.scan_region
-        auto_beam_blank = adv_acq_proxy.auto_beam_blank
+        dwell_time, base_resolution, scan_region, auto_beam_blank = (
+            attr.value
+            for attr in adv_acq_proxy.read_attributes(
+                ["dwell_time", "base_resolution", "scan_region", "auto_beam_blank"]
+            )
+        )
         
         # Acquire all images
         adorned_images = self._acquire_stem_image_advanced(
@@ -281,7 +930,7 @@ class Microscope(Device):
                 "timestamp": timestamp,
             })
         
-        return json.dumps({"images": metadata_list, "count": len(adorned_images)})
+        return _json_dumps({"images": metadata_list, "count": len(adorned_images)})
 
     @command(dtype_in=int, dtype_out=DevEncoded)
     def get_image_data_cached(self, index: int) -> tuple[str, bytes]:
@@ -296,38 +945,268 @@ class Microscope(Device):
         img_data = adorned_img.data if hasattr(adorned_img, 'data') else adorned_img
         
         meta = {"shape": list(img_data.shape), "dtype": str(img_data.dtype)}
-        return json.dumps(meta), img_data.tobytes()
+        return _json_dumps(meta), img_data.tobytes()
+
+    # ------------------------------------------------------------------
+    # Client helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def decode(encoded: tuple[str, bytes]) -> np.ndarray:
+        """
+        Rebuild the image array from a get_image / get_images_batch result.
+
+        The array is a view of the payload bytes (after LZ4 decompression
+        when the header says so) — no per-pixel copy. It is read-only for
+        bytes payloads, which is what DeviceProxy returns, and writable
+        for a bytearray.
+        Returns shape (height, width), or (frames, height, width) for a batch.
+        """
+        fmt, data = encoded
+        if fmt != IMAGE_FORMAT:
+            raise ValueError(f"Not a {IMAGE_FORMAT!r} payload: {fmt!r}")
+        header = decode_header(data)
+        count = header.frames * header.height * header.width
+        offset = HEADER.size
+        if header.codec == CODEC_LZ4:
+            if not _LZ4_AVAILABLE:
+                raise ImportError("Payload is LZ4-compressed; install lz4 to decode it")
+            # The block carries its own uncompressed size (store_size=True)
+            data = lz4.block.decompress(memoryview(data)[HEADER.size:])
+            offset = 0
+        shape = (header.height, header.width) if header.ndim == 2 else (header.frames, header.height, header.width)
+        return np.frombuffer(data, dtype=header.dtype, count=count, offset=offset).reshape(shape)
 
     # ------------------------------------------------------------------
     # Internal acquisition helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _check_batch_size(n: int, frame_bytes: int) -> None:
+        """Reject a get_images_batch whose stack would exceed _BATCH_MAX_BYTES."""
+        # Python ints: Tango hands over numpy scalars, which would overflow
+        if int(n) * int(frame_bytes) > _BATCH_MAX_BYTES:
+            tango.Except.throw_exception(
+                "BatchTooLarge",
+                f"{n} frames of {frame_bytes} bytes exceed the "
+                f"{_BATCH_MAX_BYTES // (1024 * 1024)} MiB batch limit",
+                "Microscope.get_images_batch()",
+            )
+
+    def _frame_buffer(self, name: str, height: int, width: int, dtype: np.dtype) -> tuple[bytearray, np.ndarray]:
+        """Return the detector's cached (frame, pixel view) pair, resized to this shape and dtype."""
+        key = (height, width, np.dtype(dtype))
+        cached = self._frames.get(name)
+        if cached is None or cached[0] != key:
+            # Only the current size is worth keeping
+            cached = self._frames[name] = (key, _new_frame((height, width), key[2]))
+        return cached[1]
+
+    def _shm_frame(self, shape: tuple[int, ...], dtype: np.dtype) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+        """
+        Return the next ring segment, marked as being written, and a view of its pixels.
+
+        The segment is replaced when the frame no longer fits; the old one
+        has its sequence number cleared first so attached clients see the
+        overrun.
+        """
+        dtype = np.dtype(dtype)
+        offset = SHM_HEADER_OFFSET + HEADER.size
+        size = offset + int(np.prod(shape)) * dtype.itemsize
+        shm = self._shm_ring[self._shm_next]
+        if shm is None or shm.size < size:
+            if shm is not None:
+                SHM_SEQ.pack_into(shm.buf, 0, 0)
+                shm.close()
+                shm.unlink()
+            shm = self._shm_ring[self._shm_next] = shared_memory.SharedMemory(create=True, size=size)
+        SHM_SEQ.pack_into(shm.buf, 0, 0)
+        return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+
+    def _release_shm_ring(self) -> None:
+        """Unlink every get_image_shm segment."""
+        for i, shm in enumerate(self._shm_ring):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+                self._shm_ring[i] = None
+
+    def _acquire_and_encode(
+        self,
+        name: str,
+        proxy: tango.DeviceProxy,
+        detector_type: Optional[object],
+    ) -> tuple[str, bytearray]:
+        """
+        Acquire one image and pack it into the get_image wire format.
+
+        Bound per detector by _make_handler; detector_type is the AutoScript
+        DetectorType member, or None when AutoScript has no such detector.
+        """
+        image, dwell_time, acquired_at = self._acquire_one(name, proxy, detector_type)
+
+        # Simulated images are already acquired into the frame; AutoScript
+        # images own their memory and are copied in once.
+        frame, pixels = self._frame_buffer(name, *image.shape, image.dtype)
+        if image is not pixels:
+            np.copyto(pixels, image)
+
+        return self._encode(name, frame, pixels, dwell_time, acquired_at)
+
+    def _acquire_one(
+        self,
+        name: str,
+        proxy: tango.DeviceProxy,
+        detector_type: Optional[object],
+        out: Optional[np.ndarray] = None,
+        settings: Optional[dict[str, object]] = None,
+    ) -> tuple[np.ndarray, float, float]:
+        """
+        Acquire one frame with the detector's current settings, or with
+        settings when given.
+
+        Returns (image, dwell_time, acquisition timestamp). The simulation
+        fills out when given; otherwise image is whatever array the
+        acquisition produced.
+        """
+        if name == self._acq_detector:
+            # Free-running detector: hand off the newest frame from the loop
+            return self._latest_frame()
+
+        if settings is None:
+            # Acquisition settings, as last published by the detector device
+            settings = self._detector_settings(name, proxy)
+        dwell_time: float = settings["dwell_time"]
+        width: int  = settings["image_width"]
+        height: int = settings["image_height"]
+        bit_depth: int = settings["bit_depth"]
+
+        # TODO: map (width, height) → AutoScript ImageSize enum
+        # e.g. ImageSize.PRESET_1024 when width == height == 1024
+
+        image = self._acquire_stem_image(name, detector_type, width, height, dwell_time, bit_depth, out)
+        return image, dwell_time, self._clock()
+
+    def _encode(
+        self,
+        name: str,
+        frame: bytearray,
+        pixels: np.ndarray,
+        dwell_time: float,
+        timestamp: float,
+    ) -> tuple[str, bytearray]:
+        """
+        Write the header into frame and return the DevEncoded payload.
+
+        pixels is the frame's (height, width) or (frames, height, width) view;
+        timestamp is when it was acquired.
+        """
+        codec = _COMPRESSION_CODECS[self._compression]
+        self._write_header(name, frame, pixels, dwell_time, codec, timestamp)
+
+        if codec == CODEC_LZ4:
+            payload = lz4.block.compress(
+                memoryview(frame)[HEADER.size:], mode="fast", acceleration=8
+            )
+            return IMAGE_FORMAT, frame[:HEADER.size] + payload
+
+        # Tango's DevEncoded marshalling accepts a bytearray but not a memoryview
+        return IMAGE_FORMAT, frame
+
+    def _write_header(
+        self,
+        name: str,
+        frame: bytearray | memoryview,
+        pixels: np.ndarray,
+        dwell_time: float,
+        codec: int,
+        timestamp: float,
+    ) -> None:
+        """Write the HEADER for pixels, stamped with timestamp, at the start of frame."""
+        frames, height, width = (1, *pixels.shape) if pixels.ndim == 2 else pixels.shape
+
+        # TODO: add metadata from adorned_image.metadata when using real AutoScript
+        key = (pixels.shape, pixels.dtype, dwell_time, codec)
+        template = self._header_templates.get(name)
+        if template is None or template[0] != key:
+            code = _DTYPE_CODES.get(pixels.dtype)
+            if code is None:
+                tango.Except.throw_exception(
+                    "UnsupportedDtype",
+                    f"{name} image dtype {pixels.dtype} has no wire format code. "
+                    f"Supported: {[str(dtype) for dtype in _DTYPE_CODES]}",
+                    "Microscope._write_header()",
+                )
+            header = HEADER.pack(
+                HEADER_VERSION | codec,
+                code,
+                frames,
+                height,
+                width,
+                pixels.ndim,
+                dwell_time,
+                0.0,
+                name.encode(),
+            )
+            template = self._header_templates[name] = (key, header)
+        frame[:HEADER.size] = template[1]
+        _TIMESTAMP.pack_into(frame, _TIMESTAMP_OFFSET, timestamp)
+
     def _acquire_stem_image(
         self,
-        detector_name: str,
+        name: str,
+        detector_type: Optional[object],
         width: int,
         height: int,
         dwell_time: float,
+        bit_depth: int = 16,
+        out: Optional[np.ndarray] = None,
     ) -> np.ndarray:
         """
         Call AutoScript acquisition and return numpy array.
 
-        Falls back to a simulated image when AutoScript is unavailable.
+        With AutoScript, bit_depth must be 16. Falls back to a simulated
+        image when AutoScript is unavailable; bit_depth (8 or 16) selects
+        the simulated dtype, and the simulation
+        writes into out when given (defaults to the detector's cached
+        get_image frame). A given out keeps its own shape and dtype, so a
+        pre-sized buffer is never filled with another type.
         """
         if self._microscope is not None:
             # Real AutoScript path
-            if detector_name.upper() == "HAADF":
-                detector_type = DetectorType.HAADF # :TODO --> make it general and check
-                adorned = self._microscope.acquisition.acquire_stem_image(
-                    detector_type, ImageSize.PRESET_1024, dwell_time
-                )
+            if detector_type is not None:
+                if bit_depth != 16:
+                    # No AutoScript scan setting maps to it; refuse rather than
+                    # return frames that contradict the detector's bit_depth
+                    tango.Except.throw_exception(
+                        "UnsupportedBitDepth",
+                        f"{name} bit_depth is {bit_depth}; AutoScript acquisitions "
+                        "only support 16. Set bit_depth = 16",
+                        "Microscope._acquire_stem_image()",
+                    )
+                with self._autoscript_lock:
+                    adorned = self._microscope.acquisition.acquire_stem_image(
+                        detector_type, ImageSize.PRESET_1024, dwell_time
+                    )
                 return adorned.data
             # pass  # remove this line when uncommenting above
 
         # Simulation fallback
         self.warn_stream("Simulating image acquisition (AutoScript not connected)")
-        rng = np.random.default_rng()
-        return rng.integers(0, 65535, size=(height, width), dtype=np.uint16)
+        # Acquire straight into the wire buffer. Tango serialises commands per
+        # device, so the frame is marshalled before the next call refills it.
+        if out is not None:
+            buf = out
+        else:
+            buf = self._frame_buffer(name, height, width, _BIT_DEPTH_DTYPES[bit_depth])[1]
+        bits = buf.dtype.itemsize * 8
+        if _NUMBA_AVAILABLE and bits == 16:
+            _fill_random_u16(buf, self._rng.integers(0, 1 << 63))
+            return buf
+        # Full dtype range: NumPy draws raw bits without the rejection
+        # sampling a narrower bound like [0, 65535) requires
+        buf[...] = self._rng.integers(0, 1 << bits, size=buf.shape, dtype=buf.dtype)
+        return buf
 
     def _acquire_stem_image_advanced(
         self,
@@ -375,17 +1254,17 @@ class Microscope(Device):
                 auto_beam_blank=auto_beam_blank
             )
             
-            return self._microscope.acquisition.acquire_stem_images_advanced(settings)
+            with self._autoscript_lock:
+                return self._microscope.acquisition.acquire_stem_images_advanced(settings)
         
         # Simulation fallback
         self.warn_stream(f"Simulating acquisition for {detector_names}")
-        rng = np.random.default_rng()
         
         # Calculate cropped dimensions based on scan_region
         height = int(base_resolution * scan_region[3])
         width = int(base_resolution * scan_region[2])
         
-        return [rng.integers(0, 65535, size=(height, width), dtype=np.uint16) 
+        return [self._rng.integers(0, 65535, size=(height, width), dtype=np.uint16) 
                 for _ in detector_names]
 
 
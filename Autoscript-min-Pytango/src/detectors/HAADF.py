@@ -6,8 +6,55 @@ It does NOT talk to AutoScript directly — the Microscope device
 reads these attributes via DeviceProxy before acquiring.
 """
 
+from typing import Callable, Optional
+
+import tango
 from tango import AttrWriteType, DevState
-from tango.server import Device, attribute
+from tango.server import Device, attribute, device_property
+
+try:
+    from src.detectors.settings_store import DetectorSettingsStore
+except ImportError:  # run as a script from src/detectors
+    from settings_store import DetectorSettingsStore
+
+
+class _HAADFSettings:
+    """
+    Plain slotted holder for the HAADF acquisition settings.
+
+    tango.server.Device instances carry a __dict__, so __slots__ on HAADF
+    itself would not help; the settings live here instead, where every
+    read is a slot descriptor lookup rather than an instance-dict probe.
+    """
+
+    __slots__ = ("dwell_time", "image_width", "image_height", "bit_depth")
+
+    def __init__(self) -> None:
+        # Sensible defaults — operators override via Tango DB or client writes
+        self.dwell_time: float = 1e-6   # 1 µs
+        self.image_width: int = 1024
+        self.image_height: int = 1024
+        self.bit_depth: int = 16
+
+
+def _setting_reader(name: str) -> Callable[["HAADF"], object]:
+    """Attribute fget returning one field of the device's _HAADFSettings."""
+
+    def read_setting(self: "HAADF") -> object:
+        return getattr(self._settings, name)
+
+    read_setting.__name__ = f"read_{name}"
+    return read_setting
+
+
+def _setting_writer(name: str) -> Callable[["HAADF", object], None]:
+    """Attribute fset storing one setting and publishing it (see HAADF._set)."""
+
+    def write_setting(self: "HAADF", value: object) -> None:
+        self._set(name, value)
+
+    write_setting.__name__ = f"write_{name}"
+    return write_setting
 
 
 class HAADF(Device):
@@ -19,6 +66,15 @@ class HAADF(Device):
 
     # (no hardware connection properties needed — HAADF is settings-only)
 
+    settings_store_name = device_property(
+        dtype=str,
+        default_value="",
+        doc="Name of a shared-memory DetectorSettingsStore to publish settings to, "
+            "e.g. 'detector_settings'. Set the same name on a Microscope on this "
+            "host to let it read the settings without a Tango round-trip. "
+            "Empty (default) disables the store",
+    )
+
     # ------------------------------------------------------------------
     # Attributes
     # ------------------------------------------------------------------
@@ -32,6 +88,8 @@ class HAADF(Device):
         min_value=1e-9,
         max_value=1e-3,
         doc="Per-pixel dwell time in seconds (e.g. 1e-6 = 1 µs)",
+        fget=_setting_reader("dwell_time"),
+        fset=_setting_writer("dwell_time"),
     )
 
     image_width = attribute(
@@ -40,6 +98,8 @@ class HAADF(Device):
         access=AttrWriteType.READ_WRITE,
         unit="px",
         doc="Acquisition width in pixels (should match an AutoScript ImageSize preset)",
+        fget=_setting_reader("image_width"),
+        fset=_setting_writer("image_width"),
     )
 
     image_height = attribute(
@@ -48,6 +108,19 @@ class HAADF(Device):
         access=AttrWriteType.READ_WRITE,
         unit="px",
         doc="Acquisition height in pixels",
+        fget=_setting_reader("image_height"),
+        fset=_setting_writer("image_height"),
+    )
+
+    bit_depth = attribute(
+        label="Bit Depth",
+        dtype=int,
+        access=AttrWriteType.READ_WRITE,
+        unit="bit",
+        doc="Pixel bit depth of simulated images: 8 (uint8) or 16 (uint16). "
+            "8-bit halves the simulated image payload. AutoScript acquisitions "
+            "only support 16 and are refused at 8",
+        fget=_setting_reader("bit_depth"),
     )
 
     # ------------------------------------------------------------------
@@ -58,34 +131,52 @@ class HAADF(Device):
         Device.init_device(self)
         self.set_state(DevState.ON)
 
-        # Sensible defaults — operators override via Tango DB or client writes
-        self._dwell_time: float = 1e-6   # 1 µs
-        self._image_width: int = 1024
-        self._image_height: int = 1024
-
-        self.info_stream("HAADF device initialised")
+        self._settings = _HAADFSettings()
 
-    # ------------------------------------------------------------------
-    # Attribute read / write
-    # ------------------------------------------------------------------
+        # Optional shared-memory mirror of the settings for a co-located Microscope
+        self._store: Optional[DetectorSettingsStore] = None
+        if self.settings_store_name:
+            self._store = DetectorSettingsStore(self.settings_store_name)
+            self._store.publish(
+                "haadf", **{name: getattr(self._settings, name) for name in _HAADFSettings.__slots__}
+            )
 
-    def read_dwell_time(self) -> float:
-        return self._dwell_time
+        # Pushed manually on every write so the Microscope can cache these
+        # settings instead of reading them before each acquisition
+        for name in ("dwell_time", "image_width", "image_height", "bit_depth"):
+            self.set_change_event(name, True, False)
 
-    def write_dwell_time(self, value: float) -> None:
-        self._dwell_time = value
+        self.info_stream("HAADF device initialised")
 
-    def read_image_width(self) -> int:
-        return self._image_width
+    def delete_device(self) -> None:
+        if self._store is not None:
+            self._store.withdraw("haadf")
+            self._store.close()
+            self._store = None
+        Device.delete_device(self)
 
-    def write_image_width(self, value: int) -> None:
-        self._image_width = value
+    def _set(self, name: str, value: object) -> None:
+        """Store a setting, mirror it to the shared store and notify subscribers."""
+        setattr(self._settings, name, value)
+        if self._store is not None:
+            self._store.set("haadf", name, value)
+        self.push_change_event(name, value)
 
-    def read_image_height(self) -> int:
-        return self._image_height
+    # ------------------------------------------------------------------
+    # Attribute read / write
+    # ------------------------------------------------------------------
 
-    def write_image_height(self, value: int) -> None:
-        self._image_height = value
+    # Reads, and writes without validation, are bound in the attribute
+    # declarations via _setting_reader / _setting_writer
+
+    def write_bit_depth(self, value: int) -> None:
+        if value not in (8, 16):
+            tango.Except.throw_exception(
+                "InvalidBitDepth",
+                f"Bit depth must be 8 or 16, got {value}",
+                "HAADF.write_bit_depth()",
+            )
+        self._set("bit_depth", value)
 
 
 # ----------------------------------------------------------------------
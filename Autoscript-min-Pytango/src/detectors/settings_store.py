@@ -0,0 +1,102 @@
+"""
+Shared-memory store for detector acquisition settings.
+
+Detector settings devices (HAADF, and later EDS/EELS/BF) write their
+settings through to one fixed-size numpy record array in POSIX shared
+memory; a Microscope on the same host attaches to the same segment and
+reads settings locally instead of calling each detector over Tango.
+
+One record per detector, indexed by DETECTOR_SLOTS. A record is only
+trusted while its ``valid`` flag is set — the owning device sets it once
+its defaults are written and clears it on shutdown, so readers fall back
+to DeviceProxy reads whenever the detector is not running.
+
+Fields are written one at a time by a single writer (the detector device),
+so a reader may see a write to one setting before the next — the same
+ordering it would get from separate attribute writes over Tango.
+
+The segment outlives the processes that use it (neither side unlinks it
+on exit) so either device can restart without the other losing the store.
+Remove it with DetectorSettingsStore(name).unlink() when tearing down.
+"""
+
+import os
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+import numpy as np
+
+# One record per detector; valid marks a record its device has populated
+SETTINGS_DTYPE = np.dtype(
+    [
+        ("dwell_time", np.float64),
+        ("image_width", np.int32),
+        ("image_height", np.int32),
+        ("bit_depth", np.int32),
+        ("valid", np.uint8),
+    ],
+    align=True,
+)
+
+# Record index per detector name — append new detectors, never reorder
+DETECTOR_SLOTS: dict[str, int] = {"haadf": 0, "bf": 1, "eds": 2, "eels": 3}
+
+_SETTING_FIELDS: tuple[str, ...] = ("dwell_time", "image_width", "image_height", "bit_depth")
+
+
+class DetectorSettingsStore:
+    """Named shared-memory segment holding every detector's settings record."""
+
+    def __init__(self, name: str) -> None:
+        size = SETTINGS_DTYPE.itemsize * len(DETECTOR_SLOTS)
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # The resource tracker would unlink the segment when this process
+            # exits, pulling it from under the other devices still using it
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        self.records = np.ndarray((len(DETECTOR_SLOTS),), dtype=SETTINGS_DTYPE, buffer=self._shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def get(self, detector: str) -> Optional[dict[str, object]]:
+        """Settings of a detector as a dict, or None if its record is not valid."""
+        slot = DETECTOR_SLOTS.get(detector)
+        if slot is None:
+            return None
+        record = self.records[slot]
+        if not record["valid"]:
+            return None
+        return {field: record[field].item() for field in _SETTING_FIELDS}
+
+    def set(self, detector: str, field: str, value: object) -> None:
+        """Write a single setting of a detector."""
+        self.records[DETECTOR_SLOTS[detector]][field] = value
+
+    def publish(self, detector: str, **settings: object) -> None:
+        """Write a detector's full settings and mark its record valid."""
+        record = self.records[DETECTOR_SLOTS[detector]]
+        for field, value in settings.items():
+            record[field] = value
+        record["valid"] = 1
+
+    def withdraw(self, detector: str) -> None:
+        """Mark a detector's record invalid, sending readers back to Tango."""
+        self.records[DETECTOR_SLOTS[detector]]["valid"] = 0
+
+    def close(self) -> None:
+        """Detach this process from the segment (the segment itself remains)."""
+        # The record view pins the buffer; drop it before closing the mapping
+        self.records = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Remove the segment from the system once no device needs it."""
+        if os.name == "posix":
+            # unlink() unregisters from the tracker, which expects a prior register
+            resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
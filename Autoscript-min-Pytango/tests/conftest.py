@@ -16,6 +16,7 @@ import tango
 from tango.test_context import MultiDeviceTestContext
 
 # Import device classes to test
+from src.acquistion.advanced_acquisition import AdvancedAcquisition
 from src.detectors.HAADF import HAADF
 from src.Microscope import Microscope as RealMicroscope
 
@@ -30,10 +31,12 @@ class TestMicroscope(RealMicroscope):
         self._microscope = None
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def tango_ctx():
     """
-    One Tango device server hosting HAADF + Microscope together.
+    One Tango device server hosting HAADF, AdvancedAcquisition and the
+    Microscope together, shared by the whole session: a second
+    MultiDeviceTestContext in the same process hangs at start-up.
 
     Device names here MUST match what you put into Microscope properties.
     """
@@ -50,6 +53,10 @@ def tango_ctx():
                 }
             ],
         },
+        {
+            "class": AdvancedAcquisition,
+            "devices": [{"name": "test/nodb/advancedacquisition"}],
+        },
         {
             "class": TestMicroscope,
             "devices": [
@@ -58,11 +65,23 @@ def tango_ctx():
                     "properties": {
                         # IMPORTANT: address must match the HAADF device name above
                         "haadf_device_address": "test/nodb/haadf",
+                        # Microscope.init_device opens a proxy to it too
+                        "advanced_acquisition_device_address": "test/nodb/advancedacquisition",
                         # you can also set these if you later fix autoscript_host usage
                         "autoscript_host_ip": "localhost",
                         "autoscript_host_port": "9090",
                     },
-                }
+                },
+                {
+                    # Same detectors, with the opt-in settings cache and coarse clock
+                    "name": "test/nodb/microscope_cached",
+                    "properties": {
+                        "haadf_device_address": "test/nodb/haadf",
+                        "advanced_acquisition_device_address": "test/nodb/advancedacquisition",
+                        "cache_detector_settings": True,
+                        "timestamp_precision": "coarse",
+                    },
+                },
             ],
         },
     ]
@@ -82,4 +101,9 @@ def haadf_proxy(tango_ctx) -> tango.DeviceProxy:
 
 @pytest.fixture(scope="module")
 def microscope_proxy(tango_ctx) -> tango.DeviceProxy:
-    return tango.DeviceProxy("test/nodb/microscope")
\ No newline at end of file
+    return tango.DeviceProxy("test/nodb/microscope")
+
+
+@pytest.fixture(scope="module")
+def cached_microscope_proxy(tango_ctx) -> tango.DeviceProxy:
+    return tango.DeviceProxy("test/nodb/microscope_cached")
\ No newline at end of file
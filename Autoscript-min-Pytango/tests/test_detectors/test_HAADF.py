@@ -32,6 +32,20 @@ class TestHAADFAttributes:
         haadf_proxy.image_height = 512
         assert haadf_proxy.image_height == 512
 
+    def test_default_bit_depth(self, haadf_proxy):
+        assert haadf_proxy.bit_depth == 16
+
+    def test_write_bit_depth(self, haadf_proxy):
+        haadf_proxy.bit_depth = 8
+        assert haadf_proxy.bit_depth == 8
+        haadf_proxy.bit_depth = 16
+
+    def test_invalid_bit_depth_rejected(self, haadf_proxy):
+        import tango
+        with pytest.raises(tango.DevFailed):
+            haadf_proxy.bit_depth = 12
+        assert haadf_proxy.bit_depth == 16
+
 
 class TestHAADFState:
     """Device state checks."""
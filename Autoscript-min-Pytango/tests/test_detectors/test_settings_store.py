@@ -0,0 +1,56 @@
+"""
+Tests for the shared-memory DetectorSettingsStore.
+
+Two handles on the same segment stand in for a detector device and the
+Microscope attached from another process.
+"""
+
+import uuid
+
+import pytest
+
+from src.detectors.settings_store import DetectorSettingsStore
+
+
+@pytest.fixture
+def stores():
+    name = f"test_store_{uuid.uuid4().hex[:8]}"
+    writer = DetectorSettingsStore(name)
+    reader = DetectorSettingsStore(name)
+    yield writer, reader
+    reader.close()
+    writer.unlink()
+    writer.close()
+
+
+class TestDetectorSettingsStore:
+
+    def test_unpublished_detector_reads_none(self, stores):
+        _, reader = stores
+        assert reader.get("haadf") is None
+
+    def test_publish_visible_to_other_handle(self, stores):
+        writer, reader = stores
+        writer.publish("haadf", dwell_time=2e-6, image_width=512, image_height=256, bit_depth=8)
+        assert reader.get("haadf") == {
+            "dwell_time": pytest.approx(2e-6),
+            "image_width": 512,
+            "image_height": 256,
+            "bit_depth": 8,
+        }
+
+    def test_set_single_field(self, stores):
+        writer, reader = stores
+        writer.publish("haadf", dwell_time=1e-6, image_width=1024, image_height=1024, bit_depth=16)
+        writer.set("haadf", "image_width", 128)
+        assert reader.get("haadf")["image_width"] == 128
+
+    def test_withdraw_invalidates(self, stores):
+        writer, reader = stores
+        writer.publish("haadf", dwell_time=1e-6, image_width=1024, image_height=1024, bit_depth=16)
+        writer.withdraw("haadf")
+        assert reader.get("haadf") is None
+
+    def test_unknown_detector_reads_none(self, stores):
+        _, reader = stores
+        assert reader.get("nope") is None
@@ -1,45 +1,328 @@
-# """
-# Tests for the Microscope Tango device.
+"""
+Tests for the Microscope device and its image wire format.
 
-# AutoScript is not available in CI — the Microscope device falls back
-# to simulation mode, so image shape/dtype assertions are against the
-# simulated output.
-# """
+The wire format tests (HEADER, decode_header, Microscope.decode) are pure
+functions and start no device. The device tests run against the shared
+test server in conftest.py; AutoScript is not available there, so the
+Microscope falls back to simulation mode and image shape/dtype
+assertions are against the simulated output.
+"""
 
-# import json
+import collections
+import threading
+import time
+import types
+from multiprocessing import resource_tracker, shared_memory
 
-# import numpy as np
-# import pytest
-# import tango
+import numpy as np
+import pytest
+import tango
 
+from src.Microscope import (
+    CODEC_LZ4,
+    CODEC_NONE,
+    HEADER,
+    HEADER_VERSION,
+    IMAGE_FORMAT,
+    SHM_DESCRIPTOR,
+    SHM_HEADER_OFFSET,
+    SHM_SEQ,
+    Microscope,
+    _new_frame,
+    decode_header,
+)
 
-# class TestMicroscopeState:
 
-#     def test_initial_state_is_on(self, microscope_proxy):
-#         assert microscope_proxy.state() == tango.DevState.ON
+# ----------------------------------------------------------------------
+# Wire format — pure functions, no Tango device needed
+# ----------------------------------------------------------------------
 
 
-# class TestGetImage:
+class _Encoder:
+    """The state Microscope._encode and _write_header use, without a device."""
 
-#     def test_get_haadf_image_returns_encoded(self, microscope_proxy):
-#         result = microscope_proxy.get_image("haadf")
-#         # DevEncoded comes back as a two-element sequence
-#         assert len(result) == 2
+    _encode = Microscope._encode
+    _write_header = Microscope._write_header
 
-#     def test_metadata_is_valid_json(self, microscope_proxy):
-#         json_meta, _ = microscope_proxy.get_image("haadf")
-#         meta = json.loads(json_meta)
-#         assert "shape" in meta
-#         assert "dtype" in meta
-#         assert "detector" in meta
-#         assert "timestamp" in meta
+    def __init__(self, compression: str = "none") -> None:
+        self._compression = compression
+        self._header_templates = {}
 
-#     def test_image_shape_matches_metadata(self, microscope_proxy):
-#         json_meta, raw_bytes = microscope_proxy.get_image("haadf")
-#         meta = json.loads(json_meta)
-#         image = np.frombuffer(raw_bytes, dtype=meta["dtype"]).reshape(meta["shape"])
-#         assert image.shape == tuple(meta["shape"])
 
-#     def test_unknown_detector_raises(self, microscope_proxy):
-#         with pytest.raises(tango.DevFailed):
-#             microscope_proxy.get_image("nonexistent_detector")
\ No newline at end of file
+# Acquisition timestamp written by _encode
+_ACQUIRED_AT = 1_700_000_000.25
+
+
+def _encode(pixels: np.ndarray, compression: str = "none") -> tuple[str, bytes]:
+    frame, view = _new_frame(pixels.shape, pixels.dtype)
+    view[...] = pixels
+    fmt, payload = _Encoder(compression)._encode("haadf", frame, view, 2e-6, _ACQUIRED_AT)
+    return fmt, bytes(payload)
+
+
+@pytest.fixture
+def image() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 1 << 16, size=(32, 48), dtype=np.uint16)
+
+
+class TestNewFrame:
+
+    def test_pixels_follow_header(self):
+        frame, pixels = _new_frame((4, 6), np.uint8)
+        assert len(frame) == HEADER.size + 24
+        pixels[...] = 7
+        assert frame[HEADER.size:] == bytes([7]) * 24
+        assert frame[:HEADER.size] == bytes(HEADER.size)
+
+
+class TestHeader:
+
+    def test_round_trip(self, image):
+        fmt, data = _encode(image)
+        header = decode_header(data)
+        assert fmt == IMAGE_FORMAT
+        assert header.version == HEADER_VERSION
+        assert header.codec == CODEC_NONE
+        assert header.dtype == np.uint16
+        assert (header.frames, header.height, header.width, header.ndim) == (1, 32, 48, 2)
+        assert header.dwell_time == 2e-6
+        assert header.detector == "haadf"
+        assert header.timestamp == _ACQUIRED_AT
+
+    def test_timestamp_restamped_from_cached_template(self, image):
+        encoder = _Encoder()
+        frame, pixels = _new_frame(image.shape, image.dtype)
+        encoder._write_header("haadf", frame, pixels, 2e-6, CODEC_NONE, 1.0)
+        first = decode_header(frame)
+        encoder._write_header("haadf", frame, pixels, 2e-6, CODEC_NONE, 2.0)
+        second = decode_header(frame)
+        assert (first.timestamp, second.timestamp) == (1.0, 2.0)
+        assert second.height == first.height
+
+
+    def test_pixels_are_aligned(self):
+        assert HEADER.size % 8 == 0
+        frame, pixels = _new_frame((4, 4), np.float64)
+        assert pixels.flags.aligned
+
+    def test_unsupported_dtype_rejected(self):
+        frame, pixels = _new_frame((2, 2), np.complex64)
+        with pytest.raises(tango.DevFailed):
+            _Encoder()._write_header("haadf", frame, pixels, 2e-6, CODEC_NONE, 0.0)
+
+
+class TestDecode:
+
+    def test_uncompressed(self, image):
+        fmt, data = _encode(image)
+        assert len(data) == HEADER.size + image.nbytes
+        np.testing.assert_array_equal(Microscope.decode((fmt, data)), image)
+
+    def test_uint8(self):
+        image = np.arange(20, dtype=np.uint8).reshape(4, 5)
+        np.testing.assert_array_equal(Microscope.decode(_encode(image)), image)
+
+    def test_float64(self):
+        image = np.linspace(-1, 1, 20).reshape(4, 5)
+        np.testing.assert_array_equal(Microscope.decode(_encode(image)), image)
+
+    def test_batch_stack(self, image):
+        stack = np.stack([image, image[::-1], image // 2])
+        fmt, data = _encode(stack)
+        header = decode_header(data)
+        assert (header.frames, header.height, header.width, header.ndim) == (3, 32, 48, 3)
+        np.testing.assert_array_equal(Microscope.decode((fmt, data)), stack)
+
+    def test_lz4(self, image):
+        pytest.importorskip("lz4.block")
+        image[:16] = 0  # compressible
+        fmt, data = _encode(image, "lz4")
+        assert decode_header(data).codec == CODEC_LZ4
+        assert len(data) < HEADER.size + image.nbytes
+        np.testing.assert_array_equal(Microscope.decode((fmt, data)), image)
+
+    def test_wrong_format_rejected(self, image):
+        _, data = _encode(image)
+        with pytest.raises(ValueError):
+            Microscope.decode(("something_else", data))
+
+
+class _Ring:
+    """The state Microscope._acquire_one uses to serve a free-running detector."""
+
+    _acquire_one = Microscope._acquire_one
+    _latest_frame = Microscope._latest_frame
+
+    def __init__(self) -> None:
+        self._acq_detector = "haadf"
+        self._ring = collections.deque(maxlen=4)
+        self._ring_cond = threading.Condition()
+
+
+class TestFreeRunningRing:
+
+    def test_newest_frame_keeps_its_acquisition_time(self, image):
+        ring = _Ring()
+        ring._ring.extend([(image, 2e-6, 10.0), (image[::-1], 3e-6, 11.0)])
+        frame, dwell_time, acquired_at = ring._acquire_one("haadf", None, None)
+        np.testing.assert_array_equal(frame, image[::-1])
+        assert (dwell_time, acquired_at) == (3e-6, 11.0)
+        assert not ring._ring
+
+
+class TestAutoScriptBitDepth:
+
+    def test_8_bit_rejected(self):
+        # Any non-None microscope and detector type take the AutoScript path
+        acquirer = types.SimpleNamespace(_microscope=object())
+        with pytest.raises(tango.DevFailed, match="UnsupportedBitDepth"):
+            Microscope._acquire_stem_image(acquirer, "haadf", object(), 64, 64, 1e-6, 8)
+
+
+# ----------------------------------------------------------------------
+# Device — one shared test server, see conftest.py
+# ----------------------------------------------------------------------
+
+# HAADF defaults, restored after every device test
+_HAADF_DEFAULTS = {"dwell_time": 1e-6, "image_width": 1024, "image_height": 1024, "bit_depth": 16}
+
+
+@pytest.fixture
+def haadf(haadf_proxy, microscope_proxy):
+    """HAADF set to small frames; defaults and compression restored afterwards."""
+    haadf_proxy.image_width = 48
+    haadf_proxy.image_height = 32
+    yield haadf_proxy
+    for name, value in _HAADF_DEFAULTS.items():
+        haadf_proxy.write_attribute(name, value)
+    microscope_proxy.image_compression = "none"
+
+
+class TestMicroscopeState:
+
+    def test_initial_state_is_on(self, microscope_proxy):
+        assert microscope_proxy.state() == tango.DevState.ON
+
+
+class TestGetImage:
+
+    def test_get_image_returns_encoded(self, haadf, microscope_proxy):
+        fmt, data = microscope_proxy.get_image("haadf")
+        assert fmt == IMAGE_FORMAT
+        header = decode_header(data)
+        assert header.detector == "haadf"
+        assert (header.frames, header.height, header.width, header.ndim) == (1, 32, 48, 2)
+        assert header.dtype == np.uint16
+        assert len(data) == HEADER.size + 32 * 48 * 2
+
+    def test_get_haadf_image(self, haadf, microscope_proxy):
+        image = Microscope.decode(microscope_proxy.get_haadf_image())
+        assert image.shape == (32, 48)
+
+    def test_name_aliases(self, haadf, microscope_proxy):
+        for name in ("HAADF", " Haadf "):
+            assert Microscope.decode(microscope_proxy.get_image(name)).shape == (32, 48)
+
+    def test_timestamp_is_acquisition_time(self, haadf, microscope_proxy):
+        before = time.time()
+        header = decode_header(microscope_proxy.get_image("haadf")[1])
+        assert before <= header.timestamp <= time.time()
+
+    def test_unknown_detector_raises(self, microscope_proxy):
+        with pytest.raises(tango.DevFailed):
+            microscope_proxy.get_image("nonexistent_detector")
+
+    def test_bit_depth_8(self, haadf, microscope_proxy):
+        haadf.bit_depth = 8
+        image = Microscope.decode(microscope_proxy.get_image("haadf"))
+        assert image.dtype == np.uint8
+
+    def test_lz4(self, haadf, microscope_proxy):
+        pytest.importorskip("lz4.block")
+        microscope_proxy.image_compression = "lz4"
+        fmt, data = microscope_proxy.get_image("haadf")
+        assert decode_header(data).codec == CODEC_LZ4
+        assert Microscope.decode((fmt, data)).shape == (32, 48)
+
+    def test_unknown_compression_rejected(self, microscope_proxy):
+        with pytest.raises(tango.DevFailed):
+            microscope_proxy.image_compression = "zip"
+        assert microscope_proxy.image_compression == "none"
+
+
+class TestSettings:
+
+    def test_write_applies_to_next_acquisition(self, haadf, microscope_proxy):
+        # Regression: settings used to come from an event-driven cache,
+        # which could still hold the previous width
+        for width in range(16, 66, 2):
+            haadf.image_width = width
+            header = decode_header(microscope_proxy.get_image("haadf")[1])
+            assert header.width == width
+
+    def test_cache_follows_change_events(self, haadf, cached_microscope_proxy):
+        assert decode_header(cached_microscope_proxy.get_image("haadf")[1]).width == 48
+        haadf.image_width = 24
+        deadline = time.monotonic() + 5
+        while decode_header(cached_microscope_proxy.get_image("haadf")[1]).width != 24:
+            assert time.monotonic() < deadline, "change event never reached the cache"
+            time.sleep(0.05)
+
+    def test_coarse_timestamp(self, haadf, cached_microscope_proxy):
+        before = time.time()
+        header = decode_header(cached_microscope_proxy.get_image("haadf")[1])
+        assert before - 0.01 <= header.timestamp <= time.time() + 0.01
+
+
+class TestGetImagesBatch:
+
+    def test_stack(self, haadf, microscope_proxy):
+        fmt, data = microscope_proxy.get_images_batch(([3], ["haadf"]))
+        header = decode_header(data)
+        assert (header.frames, header.height, header.width, header.ndim) == (3, 32, 48, 3)
+        assert Microscope.decode((fmt, data)).shape == (3, 32, 48)
+
+    @pytest.mark.parametrize(
+        "args",
+        [([1, 2], ["haadf"]), ([1], ["haadf", "haadf"]), ([0], ["haadf"]), ([70000], ["haadf"]), ([1], ["nope"])],
+    )
+    def test_invalid_arguments_rejected(self, haadf, microscope_proxy, args):
+        with pytest.raises(tango.DevFailed):
+            microscope_proxy.get_images_batch(args)
+
+    def test_too_large_rejected(self, haadf, microscope_proxy):
+        haadf.image_width = haadf.image_height = 4096
+        with pytest.raises(tango.DevFailed, match="BatchTooLarge"):
+            microscope_proxy.get_images_batch(([100], ["haadf"]))
+
+    def test_settings_change_during_batch(self, haadf, microscope_proxy):
+        # Regression: a bit_depth write mid-batch switched later frames to
+        # 8-bit data inside a stack whose header said uint16. Many small
+        # frames keep the batch running well past the write.
+        haadf.image_width = haadf.image_height = 16
+        microscope_proxy.set_timeout_millis(30000)
+        writer = threading.Timer(0.1, lambda: setattr(haadf, "bit_depth", 8))
+        writer.start()
+        stack = Microscope.decode(microscope_proxy.get_images_batch(([60000], ["haadf"])))
+        writer.join()
+        assert haadf.bit_depth == 8
+        assert stack.dtype == np.uint16
+        # Uniform 16-bit noise: every frame has pixels above the 8-bit range
+        assert (stack.reshape(len(stack), -1).max(axis=1) > 255).all()
+
+
+class TestGetImageShm:
+
+    def test_frame_in_segment(self, haadf, microscope_proxy):
+        fmt, desc = microscope_proxy.get_image_shm("haadf")
+        seq, name = SHM_DESCRIPTOR.unpack(desc)
+        shm = shared_memory.SharedMemory(name=name.rstrip(b"\0").decode())
+        # The segment belongs to the device; keep the tracker from unlinking it
+        resource_tracker.unregister(shm._name, "shared_memory")
+        try:
+            assert SHM_SEQ.unpack_from(shm.buf)[0] == seq
+            header = decode_header(shm.buf[SHM_HEADER_OFFSET:])
+            assert (header.height, header.width, header.dtype) == (32, 48, np.uint16)
+        finally:
+            shm.close()
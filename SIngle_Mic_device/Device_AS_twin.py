@@ -10,10 +10,106 @@ Design: Detector parameters (active, dwell_time, resolution) are set via attribu
 This file is designed to be a learning example - simple and clear!
 """
 
-import time
+import contextlib
+import functools
+import struct
+
+import gevent
 import numpy as np
-from tango import DevState, AttrWriteType, DevVarDoubleArray
-from tango.server import Device, command, attribute
+from tango import DevState, AttrWriteType, DevEncoded, DevVarDoubleArray, GreenMode
+from tango.server import Device, command, attribute, device_property
+
+
+# Simulated detectors, exposed as detector_A, detector_B, ...
+_DETECTOR_IDS = "ABC"
+_DETECTOR_NAMES = [f"detector_{k}" for k in _DETECTOR_IDS]
+# Row of each detector in DeviceASTwin._dets
+_DETECTOR_INDEX = {name: i for i, name in enumerate(_DETECTOR_NAMES)}
+
+# Largest image a detector can acquire, in pixels per side
+_MAX_RESOLUTION = 4096
+
+# Settings record of one detector
+_DETECTOR_DTYPE = np.dtype([("active", "?"), ("dwell_time", "f8"), ("resolution", "i8")])
+
+
+# GetImages payload: IMAGES_HEADER (image count), one IMAGES_ENTRY
+# (detector name, resolution) per image, then the images' uint8 pixels
+# back to back. Split it with decode_images().
+IMAGES_FORMAT = "twin_images"
+IMAGES_HEADER = struct.Struct("<H")
+IMAGES_ENTRY = struct.Struct("<16sI")
+
+
+def decode_images(encoded):
+    """Split a GetImages result into {detector_name: (resolution, resolution) uint8 image}."""
+    fmt, data = encoded
+    if fmt != IMAGES_FORMAT:
+        raise ValueError(f"Not a GetImages payload: format {fmt!r}")
+    (count,) = IMAGES_HEADER.unpack_from(data)
+    offset = IMAGES_HEADER.size + count * IMAGES_ENTRY.size
+    images = {}
+    for name, resolution in IMAGES_ENTRY.iter_unpack(data[IMAGES_HEADER.size:offset]):
+        pixels = np.frombuffer(data, dtype=np.uint8, count=resolution * resolution, offset=offset)
+        images[name.rstrip(b"\0").decode()] = pixels.reshape(resolution, resolution)
+        offset += pixels.size
+    return images
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_conn(connection_string):
+    """Split "host[:port]" into (host, port); the port defaults to 9001."""
+    host, _, port = connection_string.partition(":")
+    return host, int(port) if port else 9001
+
+
+def _detector_accessors(detector_name, key):
+    """
+    Build the fget/fset pair for one detector setting attribute.
+
+    Every detector_X_* attribute reads and writes a field of the
+    detector's row in DeviceASTwin._dets, so the accessors only differ
+    in which row and field they touch.
+    """
+    def read(self):
+        return self._read_detector_setting(detector_name, key)
+
+    def write(self, value):
+        self._write_detector_setting(detector_name, key, value)
+
+    read.__name__ = f"read_{detector_name}_{key}"
+    write.__name__ = f"write_{detector_name}_{key}"
+    return {"fget": read, "fset": write}
+
+
+def _detector_attributes(detector_id):
+    """Build the (active, dwell_time, resolution) attribute declarations of one detector."""
+    name = f"detector_{detector_id}"
+    label = f"Detector {detector_id}"
+    active = attribute(
+        label=f"{label} Active",
+        dtype=bool,
+        access=AttrWriteType.READ_WRITE,
+        **_detector_accessors(name, "active"),
+    )
+    dwell_time = attribute(
+        label=f"{label} Dwell Time",
+        dtype=float,
+        access=AttrWriteType.READ_WRITE,
+        unit="s",
+        format="%6.3f",
+        **_detector_accessors(name, "dwell_time"),
+    )
+    resolution = attribute(
+        label=f"{label} Resolution",
+        dtype=int,
+        access=AttrWriteType.READ_WRITE,
+        unit="px",
+        min_value=1,
+        max_value=_MAX_RESOLUTION,
+        **_detector_accessors(name, "resolution"),
+    )
+    return active, dwell_time, resolution
 
 
 class DeviceASTwin(Device):
@@ -29,31 +125,52 @@ class DeviceASTwin(Device):
         device.detector_A_resolution = 256
         image = device.GetImage('detector_A')
     
+    or, in one round-trip:
+        device.Configure(['detector_A', '0.1', '256', '1'])
+    
+    All active detectors at once:
+        images = decode_images(device.GetImages())  # {'detector_A': image, ...}
+    
     States:
         INIT: Device initialized but not connected
         STANDBY: Connected and ready
-        RUNNING: Acquiring data
+        RUNNING: Acquiring data (unless report_running_state is False)
         FAULT: Error condition
+    
+    Subscribe to State change events rather than polling it: the device
+    pushes one on every transition (INIT, Connect, RUNNING, and the end or
+    failure of an acquisition).
     """
     
+    # Gevent green mode: while GetImage waits in gevent.sleep, other
+    # requests (attribute polls, GetStage) are served instead of queueing
+    green_mode = GreenMode.Gevent
+    
     # ========================================================================
-    # Attribute Declarations (Class Level)
+    # Device Properties
     # ========================================================================
     
-    # Detector A
-    detector_A_active = attribute(label="Detector A Active", dtype=bool, access=AttrWriteType.READ_WRITE)
-    detector_A_dwell_time = attribute(label="Detector A Dwell Time", dtype=float, access=AttrWriteType.READ_WRITE, unit="s", format="%6.3f")
-    detector_A_resolution = attribute(label="Detector A Resolution", dtype=int, access=AttrWriteType.READ_WRITE, unit="px")
+    simulation_seed = device_property(
+        dtype=int,
+        default_value=-1,
+        doc="Seed for the simulated data, for reproducible runs; -1 (default) seeds from OS entropy",
+    )
+    report_running_state = device_property(
+        dtype=bool,
+        default_value=True,
+        doc="Switch to RUNNING while acquiring; False stays in STANDBY, so an "
+            "acquisition only pushes the State change event when it ends",
+    )
     
-    # Detector B
-    detector_B_active = attribute(label="Detector B Active", dtype=bool, access=AttrWriteType.READ_WRITE)
-    detector_B_dwell_time = attribute(label="Detector B Dwell Time", dtype=float, access=AttrWriteType.READ_WRITE, unit="s", format="%6.3f")
-    detector_B_resolution = attribute(label="Detector B Resolution", dtype=int, access=AttrWriteType.READ_WRITE, unit="px")
+    # ========================================================================
+    # Attribute Declarations (Class Level)
+    # ========================================================================
     
-    # Detector C
-    detector_C_active = attribute(label="Detector C Active", dtype=bool, access=AttrWriteType.READ_WRITE)
-    detector_C_dwell_time = attribute(label="Detector C Dwell Time", dtype=float, access=AttrWriteType.READ_WRITE, unit="s", format="%6.3f")
-    detector_C_resolution = attribute(label="Detector C Resolution", dtype=int, access=AttrWriteType.READ_WRITE, unit="px")
+    # One line per detector in _DETECTOR_IDS (declared in the class body:
+    # PyTango only exports attributes present when the class is created)
+    detector_A_active, detector_A_dwell_time, detector_A_resolution = _detector_attributes("A")
+    detector_B_active, detector_B_dwell_time, detector_B_resolution = _detector_attributes("B")
+    detector_C_active, detector_C_dwell_time, detector_C_resolution = _detector_attributes("C")
     
     # Microscope status
     microscope_connected = attribute(label="Microscope Connected", dtype=bool, access=AttrWriteType.READ)
@@ -68,135 +185,118 @@ class DeviceASTwin(Device):
         
         # Microscope connection
         self.microscope = None
+
+        # Hot-path log calls check the level first: info_stream formats the
+        # message and inspects the call stack even when the level is off
+        self._logger = self.get_logger()
+
+        # Random source for the simulated image and stage readouts
+        self._rng = np.random.default_rng(None if self.simulation_seed < 0 else self.simulation_seed)
         
-        # Detector A configuration
-        self._detector_A_active = False
-        self._detector_A_dwell_time = 0.1
-        self._detector_A_resolution = 256
-        
-        # Detector B configuration
-        self._detector_B_active = False
-        self._detector_B_dwell_time = 0.1
-        self._detector_B_resolution = 256
-        
-        # Detector C configuration
-        self._detector_C_active = False
-        self._detector_C_dwell_time = 0.1
-        self._detector_C_resolution = 256
+        # Per-detector configuration: one record per detector, in
+        # _DETECTOR_NAMES order, so checks across detectors are vectorised
+        self._dets = np.rec.array([(False, 0.1, 256)] * len(_DETECTOR_NAMES), dtype=_DETECTOR_DTYPE)
         
+        # State change events are pushed by the device on every transition
+        # (_change_state), not detected by polling
+        self.set_change_event("State", True, False)
         
         # Set initial state
-        self.set_state(DevState.INIT)
-        self.set_status("Device initialized. Use Connect command to connect to microscope.")
+        self._change_state(DevState.INIT, "Device initialized. Use Connect command to connect to microscope.")
     
     # ========================================================================
-    # Detector A - Read/Write Methods
+    # Detector Settings - Read/Write Methods (bound via _detector_accessors)
     # ========================================================================
     
-    def read_detector_A_active(self):
-        return self._detector_A_active
-    
-    def write_detector_A_active(self, value):
-        if not self._detector_A_active and value:
-            self.info_stream("Activating detector_A")
-        self._detector_A_active = value
-    
-    def read_detector_A_dwell_time(self):
-        if not self._detector_A_active:
-            self.warn_stream("Reading dwell_time for inactive detector_A")
-        return self._detector_A_dwell_time
-    
-    def write_detector_A_dwell_time(self, value):
-        if not self._detector_A_active:
-            raise Exception("Cannot set dwell_time: detector_A is not active. Set detector_A_active = True first.")
-        self._detector_A_dwell_time = value
-        self.info_stream(f"Set detector_A dwell_time to {value}s")
-    
-    def read_detector_A_resolution(self):
-        if not self._detector_A_active:
-            self.warn_stream("Reading resolution for inactive detector_A")
-        return self._detector_A_resolution
-    
-    def write_detector_A_resolution(self, value):
-        if not self._detector_A_active:
-            raise Exception("Cannot set resolution: detector_A is not active. Set detector_A_active = True first.")
-        self._detector_A_resolution = value
-        self.info_stream(f"Set detector_A resolution to {value}")
+    def _read_detector_setting(self, detector_name, key):
+        cfg = self._dets[_DETECTOR_INDEX[detector_name]]
+        if key != "active" and not cfg["active"]:
+            if self._logger.is_warn_enabled():
+                self.warn_stream(f"Reading {key} for inactive {detector_name}")
+        return cfg[key].item()
+    
+    def _write_detector_setting(self, detector_name, key, value):
+        cfg = self._dets[_DETECTOR_INDEX[detector_name]]
+        if key == "active":
+            if not cfg["active"] and value:
+                if self._logger.is_info_enabled():
+                    self.info_stream(f"Activating {detector_name}")
+            cfg["active"] = value
+            return
+        if not cfg["active"]:
+            raise Exception(f"Cannot set {key}: {detector_name} is not active. Set {detector_name}_active = True first.")
+        self._check_setting(key, value)
+        cfg[key] = value
+        unit = "s" if key == "dwell_time" else ""
+        if self._logger.is_info_enabled():
+            self.info_stream(f"Set {detector_name} {key} to {value}{unit}")
+    
+    @staticmethod
+    def _check_setting(key, value):
+        """Reject an out-of-range dwell_time or resolution."""
+        if key == "dwell_time" and not value > 0:
+            raise ValueError("Dwell time must be positive")
+        if key == "resolution" and not 1 <= value <= _MAX_RESOLUTION:
+            raise ValueError(f"Resolution must be between 1 and {_MAX_RESOLUTION} px")
     
     # ========================================================================
-    # Detector B - Read/Write Methods
+    # Other Attributes - Read Methods
     # ========================================================================
     
-    def read_detector_B_active(self):
-        return self._detector_B_active
-    
-    def write_detector_B_active(self, value):
-        if not self._detector_B_active and value:
-            self.info_stream("Activating detector_B")
-        self._detector_B_active = value
-    
-    def read_detector_B_dwell_time(self):
-        if not self._detector_B_active:
-            self.warn_stream("Reading dwell_time for inactive detector_B")
-        return self._detector_B_dwell_time
-    
-    def write_detector_B_dwell_time(self, value):
-        if not self._detector_B_active:
-            raise Exception("Cannot set dwell_time: detector_B is not active. Set detector_B_active = True first.")
-        self._detector_B_dwell_time = value
-        self.info_stream(f"Set detector_B dwell_time to {value}s")
-    
-    def read_detector_B_resolution(self):
-        if not self._detector_B_active:
-            self.warn_stream("Reading resolution for inactive detector_B")
-        return self._detector_B_resolution
-    
-    def write_detector_B_resolution(self, value):
-        if not self._detector_B_active:
-            raise Exception("Cannot set resolution: detector_B is not active. Set detector_B_active = True first.")
-        self._detector_B_resolution = value
-        self.info_stream(f"Set detector_B resolution to {value}")
+    def read_microscope_connected(self):
+        return self.microscope is not None
     
     # ========================================================================
-    # Detector C - Read/Write Methods
+    # Helpers
     # ========================================================================
     
-    def read_detector_C_active(self):
-        return self._detector_C_active
-    
-    def write_detector_C_active(self, value):
-        if not self._detector_C_active and value:
-            self.info_stream("Activating detector_C")
-        self._detector_C_active = value
-    
-    def read_detector_C_dwell_time(self):
-        if not self._detector_C_active:
-            self.warn_stream("Reading dwell_time for inactive detector_C")
-        return self._detector_C_dwell_time
-    
-    def write_detector_C_dwell_time(self, value):
-        if not self._detector_C_active:
-            raise Exception("Cannot set dwell_time: detector_C is not active. Set detector_C_active = True first.")
-        self._detector_C_dwell_time = value
-        self.info_stream(f"Set detector_C dwell_time to {value}s")
+    def _detector_record(self, detector_name):
+        """Settings record of a detector, a view into self._dets."""
+        index = _DETECTOR_INDEX.get(detector_name)
+        if index is None:
+            raise Exception(f"Unknown detector: {detector_name}. Use 'detector_A', 'detector_B', or 'detector_C'.")
+        return self._dets[index]
     
-    def read_detector_C_resolution(self):
-        if not self._detector_C_active:
-            self.warn_stream("Reading resolution for inactive detector_C")
-        return self._detector_C_resolution
+    def _check_acquisition(self, detector_name):
+        """
+        Validate an acquisition from one detector.
+        
+        Returns:
+            (resolution, total_time) of the acquisition
+        """
+        cfg = self._detector_record(detector_name)
+        
+        # Check if detector is active
+        if not cfg["active"]:
+            raise Exception(f"Detector {detector_name} is not active. Set {detector_name}_active = True first.")
+        
+        # Validate acquisition time (max 10 minutes)
+        resolution = cfg["resolution"].item()
+        total_time = cfg["dwell_time"].item() * resolution * resolution
+        if total_time > 600:
+            raise Exception(f"Acquisition too long: {total_time:.1f}s (max 600s). Reduce dwell_time or resolution.")
+        return resolution, total_time
     
-    def write_detector_C_resolution(self, value):
-        if not self._detector_C_active:
-            raise Exception("Cannot set resolution: detector_C is not active. Set detector_C_active = True first.")
-        self._detector_C_resolution = value
-        self.info_stream(f"Set detector_C resolution to {value}")
+    def _change_state(self, state, status):
+        """Set the state and status, and push one State change event."""
+        self.set_state(state)
+        self.set_status(status)
+        self.push_change_event("State", state)
     
-    # ========================================================================
-    # Other Attributes - Read Methods
-    # ========================================================================
+    def _begin_acquisition(self, status):
+        if self.report_running_state:
+            self._change_state(DevState.RUNNING, status)
     
-    def read_microscope_connected(self):
-        return self.microscope is not None
+    @contextlib.contextmanager
+    def _fault_on_error(self, what):
+        """Go to FAULT, with a status, log and State event, if the block raises."""
+        try:
+            yield
+        except Exception as e:
+            error_msg = f"{what}: {e}"
+            self._change_state(DevState.FAULT, error_msg)
+            self.error_stream(error_msg)
+            raise
     
     # ========================================================================
     # Commands
@@ -214,35 +314,53 @@ class DeviceASTwin(Device):
             Connection status message
         """
         # Parse connection string
-        if ":" in connection_string:
-            host, port = connection_string.split(":")
-            port = int(port)
-        else:
-            host = connection_string
-            port = 9001
+        host, port = _parse_conn(connection_string)
         
-        try:
+        with self._fault_on_error("Failed to connect"):
             self.info_stream(f"Connecting to microscope at {host}:{port}...")
             
             # Digital twin mode - simulate connection
             self.microscope = 'Debugging'
             
             # Update state
-            self.set_state(DevState.STANDBY)
             msg = f"Connected to Digital Twin microscope at {host}:{port}"
-            self.set_status(msg)
+            self._change_state(DevState.STANDBY, msg)
             
             self.info_stream(msg)
             return msg
-            
-        except Exception as e:
-            self.set_state(DevState.FAULT)
-            error_msg = f"Failed to connect: {str(e)}"
-            self.set_status(error_msg)
-            self.error_stream(error_msg)
-            raise
+    
+    @command(dtype_in=[str])
+    def Configure(self, args):
+        """
+        Configure one detector in a single call.
+        
+        Args:
+            args: [detector_name, dwell_time, resolution, active],
+                  e.g. ['detector_A', '0.1', '256', '1']
+        
+        Equivalent to writing detector_X_active, detector_X_dwell_time and
+        detector_X_resolution, in one round-trip instead of three, with the
+        same checks: dwell_time > 0 and 1 <= resolution <= 4096. active is
+        1 or 0; with 0 the settings are stored and the detector is
+        deactivated, so GetImage and GetImages refuse it until it is
+        activated again. To batch arbitrary attribute writes instead, use
+        device.write_attributes([(name, value), ...]).
+        """
+        if len(args) != 4:
+            raise Exception("Configure expects [detector_name, dwell_time, resolution, active].")
+        detector_name, dwell_time, resolution, active = args
+        cfg = self._detector_record(detector_name)
+        active, dwell_time, resolution = int(active), float(dwell_time), int(resolution)
+        if active not in (0, 1):
+            raise ValueError(f"active must be 1 or 0, got {active}")
+        self._check_setting("dwell_time", dwell_time)
+        self._check_setting("resolution", resolution)
+        cfg["active"], cfg["dwell_time"], cfg["resolution"] = bool(active), dwell_time, resolution
+        self.info_stream(f"Configured {detector_name}: active={cfg['active']}, dwell_time={cfg['dwell_time']}s, resolution={cfg['resolution']}px")
+    
     # @command(dtype_in=str, dtype_out=DevVarDoubleArray)
-    @command(dtype_in=str, dtype_out=[float])
+    # Pixels are 0–255, so uint8 (DevVarCharArray) carries them at 1 byte each
+    @command(dtype_in=str, dtype_out=(np.uint8,))
     def GetImage(self, detector_name):
         """
         Acquire an image from the specified detector.
@@ -251,84 +369,107 @@ class DeviceASTwin(Device):
             detector_name: Name of detector ('detector_A', 'detector_B', or 'detector_C')
             
         Returns:
-            Flattened 1D array of image data (reshape on client side using resolution)
+            Flattened 1D uint8 array of image data (reshape on client side
+            using resolution; use image.astype(float) for float processing)
         """
         if self.microscope is None:
             raise Exception("Microscope not connected. Use Connect command first.")
         
-        # Get detector configuration based on name
-        if detector_name == 'detector_A':
-            active = self._detector_A_active
-            dwell_time = self._detector_A_dwell_time
-            resolution = self._detector_A_resolution
-        elif detector_name == 'detector_B':
-            active = self._detector_B_active
-            dwell_time = self._detector_B_dwell_time
-            resolution = self._detector_B_resolution
-        elif detector_name == 'detector_C':
-            active = self._detector_C_active
-            dwell_time = self._detector_C_dwell_time
-            resolution = self._detector_C_resolution
-        else:
-            raise Exception(f"Unknown detector: {detector_name}. Use 'detector_A', 'detector_B', or 'detector_C'.")
-        
-        # Check if detector is active
-        if not active:
-            raise Exception(f"Detector {detector_name} is not active. Set {detector_name}_active = True first.")
-        
-        # Validate acquisition time (max 10 minutes)
-        total_time = dwell_time * resolution * resolution
-        if total_time > 600:
-            raise Exception(f"Acquisition too long: {total_time:.1f}s (max 600s). Reduce dwell_time or resolution.")
+        resolution, total_time = self._check_acquisition(detector_name)
+        dwell_time = self._detector_record(detector_name)["dwell_time"]
         
-        try:
-            # Set state to RUNNING
-            self.set_state(DevState.RUNNING)
-            self.set_status(f"Acquiring {resolution}x{resolution} image from {detector_name}...")
-            self.info_stream(f"Acquiring: {detector_name}, {resolution}x{resolution}, {dwell_time}s/pixel, total={total_time:.1f}s")
+        with self._fault_on_error("Image acquisition failed"):
+            self._begin_acquisition(f"Acquiring {resolution}x{resolution} image from {detector_name}...")
             
             # Simulate acquisition time
-            time.sleep(5)
-            
-            # Generate random image (digital twin simulation)
-            image = (np.random.rand(resolution, resolution) * 255).astype(np.float64)
-            flattened_image = image.flatten()
+            gevent.sleep(5)
             
-            # Return to STANDBY state
-            self.set_state(DevState.STANDBY)
-            self.set_status("Image acquisition complete. Ready for next command.")
+            # Generate random image (digital twin simulation) directly as
+            # uint8. A fresh array per call: in green mode another GetImage
+            # may run while Tango is still marshalling this one, so a shared
+            # buffer could be overwritten.
+            image = self._rng.integers(0, 256, size=(resolution, resolution), dtype=np.uint8)
+            # C-contiguous, so ravel() is a view rather than flatten()'s copy
+            flattened_image = image.ravel()
             
-            self.info_stream(f"Returning {len(flattened_image)} pixels (reshape to {resolution}x{resolution})")
+            self._change_state(DevState.STANDBY, "Image acquisition complete. Ready for next command.")
+            if self._logger.is_info_enabled():
+                self.info_stream(
+                    f"Acquired {detector_name}: {resolution}x{resolution}, {dwell_time}s/pixel, "
+                    f"total={total_time:.1f}s; returning {len(flattened_image)} pixels"
+                )
             return flattened_image
-            
-        except Exception as e:
-            self.set_state(DevState.FAULT)
-            error_msg = f"Image acquisition failed: {str(e)}"
-            self.set_status(error_msg)
-            self.error_stream(error_msg)
-            raise
     
-    @command(dtype_out=[float])
+    @command(dtype_out=DevEncoded)
+    def GetImages(self):
+        """
+        Acquire an image from every active detector in a single call.
+        
+        The detectors acquire together: one round-trip, one RUNNING/STANDBY
+        transition and one simulated acquisition wait instead of one per
+        detector, and the pixels for all images are drawn in a single batch.
+        
+        Returns:
+            DevEncoded (IMAGES_FORMAT, layout header + uint8 pixels of each
+            active detector, in detector order). The layout travels with the
+            pixels; split it with decode_images().
+        """
+        if self.microscope is None:
+            raise Exception("Microscope not connected. Use Connect command first.")
+        
+        active = self._dets.active
+        if not active.any():
+            raise Exception("No active detectors. Set detector_X_active = True first.")
+        actives = [_DETECTOR_NAMES[i] for i in np.flatnonzero(active)]
+        
+        # Validate acquisition time (max 10 minutes) of all detectors at once
+        total_time = self._dets.dwell_time * self._dets.resolution.astype(np.float64) ** 2
+        too_long = active & (total_time > 600)
+        if too_long.any():
+            names = [_DETECTOR_NAMES[i] for i in np.flatnonzero(too_long)]
+            raise Exception(f"Acquisition too long for {', '.join(names)}: {total_time[too_long].max():.1f}s (max 600s). Reduce dwell_time or resolution.")
+        resolutions = self._dets.resolution[active].tolist()
+        lengths = [resolution * resolution for resolution in resolutions]
+        header = IMAGES_HEADER.pack(len(actives)) + b"".join(
+            IMAGES_ENTRY.pack(name.encode(), resolution) for name, resolution in zip(actives, resolutions)
+        )
+        
+        with self._fault_on_error("Image acquisition failed"):
+            self._begin_acquisition(f"Acquiring images from {', '.join(actives)}...")
+            
+            # Simulate acquisition time (shared by all detectors)
+            gevent.sleep(5)
+            
+            # One draw for every detector's pixels, already concatenated
+            # (uniform random bytes are uniform uint8 pixels)
+            payload = bytearray(header)
+            payload += self._rng.bytes(sum(lengths))
+            
+            self._change_state(DevState.STANDBY, "Image acquisition complete. Ready for next command.")
+            if self._logger.is_info_enabled():
+                self.info_stream(
+                    f"Acquired {actives}: total={total_time[active].max():.1f}s; "
+                    f"returning {sum(lengths)} pixels as {dict(zip(actives, lengths))}"
+                )
+            return IMAGES_FORMAT, payload
+    
+    @command(dtype_out=DevVarDoubleArray)
     def GetStage(self):
         """
         Get current stage position.
         
         Returns:
-            List of 5 floats: [x, y, z, tilt, rotation]
+            Array of 5 floats: [x, y, z, tilt, rotation]
         """
         if self.microscope is None:
             raise Exception("Microscope not connected. Use Connect command first.")
         
-        try:
-            # Generate random stage positions (digital twin simulation)
-            positions = [np.random.uniform(-10, 10) for _ in range(5)]
+        # Generate random stage positions (digital twin simulation)
+        # The float64 array goes to Tango in one copy, not element by element
+        positions = self._rng.uniform(-10.0, 10.0, size=5)
+        if self._logger.is_info_enabled():
             self.info_stream(f"Stage position: {positions}")
-            return positions
-            
-        except Exception as e:
-            error_msg = f"Failed to get stage position: {str(e)}"
-            self.error_stream(error_msg)
-            raise
+        return positions
 
 
 if __name__ == "__main__":
@@ -14,6 +14,14 @@ class GeventDevice(Device):
         """Standard initialization. No 'async' keyword needed."""
         super().init_device()
         self.set_state(DevState.ON)
+        # test_attribute serves this cached value; a greenlet refreshes it
+        self._test_value = 0
+        self._refresher = gevent.spawn(self._refresh_loop)
+
+    def delete_device(self):
+        """Stop the refresher greenlet"""
+        self._refresher.kill()
+        super().delete_device()
 
     @command
     def long_running_command(self):
@@ -34,9 +42,21 @@ class GeventDevice(Device):
         gevent.sleep(15)
         self.set_state(DevState.EXTRACT)
 
+    def _refresh_loop(self):
+        """Background loop doing the slow (2 s) work behind test_attribute"""
+        while True:
+            gevent.sleep(2)
+            # A new value each refresh, so clients can see the cache update
+            self._test_value += 1
+
     @attribute
     def test_attribute(self):
-        """Attributes are processed concurrently without 'await'"""
+        """Returns the cached refresh count at once, so reads never wait on the refresh"""
+        return self._test_value
+
+    @attribute
+    def slow_attribute(self):
+        """Sleeps 2 s in every read; concurrent reads queue behind each other"""
         gevent.sleep(2)
         return 42
 
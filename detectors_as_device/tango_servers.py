@@ -10,30 +10,197 @@ the single AutoScript microscope object.
 Design:
 - DetectorDevice: Individual detector with active, dwell_time, resolution, image
 - MicroscopeSystemDevice: Main coordinator that manages microscope connection
+- Each DetectorDevice acquires in its own worker process, so detectors
+  acquire in parallel on separate cores instead of sharing one GIL
 """
 
+import contextlib
+import functools
+import math
+import multiprocessing
+import queue
 import time
+
+import gevent
+import gevent.lock
 import numpy as np
-from tango import DevState, AttrWriteType
-from tango.server import Device, command, attribute
+from tango import DevState, AttrWriteType, DevVarDoubleArray, GreenMode
+from tango.server import Device, command, attribute, device_property
+
+# Numba is optional — the circular pattern falls back to NumPy without it
+try:
+    import numba
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+if _NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, cache=True, fastmath=True)
+    def _radial_pattern(out):
+        """Fill a square array with the circular pattern in one parallel pass."""
+        n = out.shape[0]
+        inv = 2.0 / (n - 1) if n > 1 else 0.0
+        for i in numba.prange(n):
+            y = -1.0 + i * inv
+            for j in range(n):
+                x = -1.0 + j * inv
+                r = math.sqrt(x * x + y * y)
+                out[i, j] = (1.0 - min(r, 1.0)) * 255.0
+
+
+# Longest wait for a frame from an acquisition worker before it is
+# considered hung and restarted (the simulated acquisition takes 2 s)
+_ACQUISITION_TIMEOUT = 30.0
+
+# Returned by _poll_result while the worker has not produced a result yet
+_PENDING = object()
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_conn(connection_string):
+    """Split "host[:port]" into (host, port); the port defaults to 9001."""
+    host, _, port = connection_string.partition(":")
+    return host, int(port) if port else 9001
+
+
+class _ImageSimulator:
+    """Simulated image source for one detector (digital twin mode)."""
+
+    def __init__(self, detector_id, seed=-1):
+        self._detector_id = detector_id
+        # A fixed seed still gives each detector its own stream
+        self._rng = np.random.default_rng(None if seed < 0 else [seed, *detector_id.encode()])
+        # Deterministic patterns (A, B) keyed by resolution
+        self._pattern_cache = {}
+
+    def generate(self, resolution):
+        """
+        Generate a simulated uint8 image.
+
+        The A and B patterns only depend on the resolution, so they are
+        computed once and reused; callers must not modify the result.
+        """
+        image = self._pattern_cache.get(resolution)
+        if image is not None:
+            return image
+
+        # Create different patterns for different detectors
+        if self._detector_id == 'A':
+            # Gradient pattern, (X + Y) / 2 * 255, built in place: a
+            # broadcast add of the 1D ramps, then one in-place scale
+            ramp = np.linspace(0, 1, resolution)
+            image = np.empty((resolution, resolution))
+            np.add(ramp[:, np.newaxis], ramp, out=image)
+            image *= 255.0 / 2.0
+        elif self._detector_id == 'B' and _NUMBA_AVAILABLE:
+            # Circular pattern, fused into one kernel
+            image = np.empty((resolution, resolution), dtype=np.float32)
+            _radial_pattern(image)
+        elif self._detector_id == 'B':
+            # Circular pattern
+            x = np.linspace(-1, 1, resolution)
+            y = np.linspace(-1, 1, resolution)
+            X, Y = np.meshgrid(x, y)
+            R = np.sqrt(X**2 + Y**2)
+            image = (1 - np.clip(R, 0, 1)) * 255
+        else:  # C
+            # Random noise, drawn directly as uint8
+            return self._rng.integers(0, 256, size=(resolution, resolution), dtype=np.uint8)
+
+        # Only the current resolution is worth keeping
+        self._pattern_cache.clear()
+        image = self._pattern_cache[resolution] = np.rint(image).astype(np.uint8)
+        return image
+
 
+def _poll_result(result_q, timeout=1.0):
+    """Next worker result, or _PENDING if none arrives within timeout."""
+    # Returns rather than raises queue.Empty: gevent's thread pool prints
+    # a traceback for every exception raised in it
+    try:
+        return result_q.get(timeout=timeout)
+    except queue.Empty:
+        return _PENDING
 
-class DetectorDevice(Device):
+
+def _acquisition_worker(detector_id, seed, cmd_q, result_q):
+    """
+    Worker process body: acquire on ('acquire', cfg) requests until None.
+
+    Each result is the image ndarray, or the exception acquisition raised.
+    """
+    simulator = _ImageSimulator(detector_id, seed)
+    while True:
+        request = cmd_q.get()
+        if request is None:
+            break
+        _, cfg = request
+        try:
+            # Simulate acquisition time (in production: actual AutoScript call)
+            time.sleep(2)  # Reduced for demo
+            # In production: microscope.imaging.grab_frame()
+            result_q.put(simulator.generate(cfg["resolution"]))
+        except Exception as e:
+            result_q.put(e)
+
+
+class _StateMixin:
+    """State and FAULT handling shared by the device classes of this server."""
+    
+    def _change_state(self, state, status):
+        """Set the state and status."""
+        self.set_state(state)
+        self.set_status(status)
+    
+    @contextlib.contextmanager
+    def _fault_on_error(self, what):
+        """Go to FAULT, with a status and error log, if the block raises."""
+        try:
+            yield
+        except Exception as e:
+            error_msg = f"{what}: {e}"
+            self._change_state(DevState.FAULT, error_msg)
+            self.error_stream(error_msg)
+            raise
+
+
+class DetectorDevice(_StateMixin, Device):
     """
     Tango device for a single detector.
     
     This device represents one detector (A, B, or C) and provides:
     - Configuration: active, dwell_time, resolution
     - Data acquisition: GetImage command
-    - State management
+    - State management: a State change event is pushed on every
+      transition (RUNNING, and the end or failure of an acquisition),
+      so subscribe rather than poll
     
     In production, this would wrap AutoScript calls for a specific detector.
     For now, it simulates detector behavior.
     """
     
+    # Gevent green mode: attribute reads stay responsive while GetImage waits
+    green_mode = GreenMode.Gevent
+    
+    simulation_seed = device_property(
+        dtype=int,
+        default_value=-1,
+        doc="Seed for the simulated data, for reproducible runs; -1 (default) seeds from OS entropy",
+    )
+    report_running_state = device_property(
+        dtype=bool,
+        default_value=True,
+        doc="Switch to RUNNING while acquiring; False stays in STANDBY, so an "
+            "acquisition only pushes the State change event when it ends",
+    )
     
     def init_device(self):
         """Initialize the detector device."""
+        super().init_device()  # reads the device properties
+
+        # For the is_*_enabled() checks before hot-path log calls
+        self._logger = self.get_logger()
+
         # Detector configuration
         self._active = False
         self._dwell_time = 0.1  # seconds per pixel
@@ -44,11 +211,73 @@ class DetectorDevice(Device):
         
         # Simulated microscope connection (in production: shared AutoScript client)
         self._microscope_connected = False
+
+        # Acquisition worker process; one request/result round trip at a
+        # time, or concurrent callers could receive each other's frames
+        self._start_worker()
+        self._acquire_lock = gevent.lock.Semaphore()
         
-        self.set_state(DevState.STANDBY)
-        self.set_status(f"Detector {self._detector_id} initialized and ready.")
+        # State events are pushed by _change_state
+        self.set_change_event("State", True, False)
+        
+        self._change_state(DevState.STANDBY, f"Detector {self._detector_id} initialized and ready.")
         self.info_stream(f"Detector {self._detector_id} initialized")
     
+    def delete_device(self):
+        """Stop the acquisition worker process."""
+        self._stop_worker()
+        super().delete_device()
+    
+    def _start_worker(self):
+        """Start the acquisition worker process with fresh queues."""
+        # "spawn" rather than fork: the Tango server process is already
+        # multi-threaded when devices initialise
+        ctx = multiprocessing.get_context("spawn")
+        self._cmd_q = ctx.Queue()
+        self._result_q = ctx.Queue()
+        self._worker = ctx.Process(
+            target=_acquisition_worker,
+            args=(self._detector_id, self.simulation_seed, self._cmd_q, self._result_q),
+            name=f"detector_{self._detector_id}-acquisition",
+            daemon=True,
+        )
+        self._worker.start()
+    
+    def _stop_worker(self):
+        self._cmd_q.put(None)
+        self._worker.join(timeout=5)
+        if self._worker.is_alive():
+            self._worker.terminate()
+    
+    def _wait_for_frame(self):
+        """
+        Wait for the worker's result in gevent's thread pool, so the server
+        stays responsive. If the worker dies or hangs, it is restarted and
+        an exception is raised rather than waiting forever.
+        """
+        deadline = time.monotonic() + _ACQUISITION_TIMEOUT
+        while True:
+            result = gevent.get_hub().threadpool.apply(_poll_result, (self._result_q,))
+            if result is not _PENDING:
+                return result
+            if not self._worker.is_alive():
+                reason = f"acquisition worker exited (exit code {self._worker.exitcode})"
+            elif time.monotonic() > deadline:
+                reason = f"no frame from the acquisition worker within {_ACQUISITION_TIMEOUT:.0f}s"
+            else:
+                continue
+            self.error_stream(f"Detector {self._detector_id}: {reason}; restarting it")
+            # Dead or hung: no point asking it to stop
+            self._worker.terminate()
+            self._worker.join(timeout=1)
+            self._start_worker()
+            raise Exception(reason)
+    
+    def _change_state(self, state, status):
+        """Set the state and status, and push one State change event."""
+        super()._change_state(state, status)
+        self.push_change_event("State", state)
+    
     # ========================================================================
     # Attributes
     # ========================================================================
@@ -65,10 +294,12 @@ class DetectorDevice(Device):
     def write_active(self, value):
         """Activate/deactivate the detector."""
         if value and not self._active:
-            self.info_stream(f"Activating detector {self._detector_id}")
+            if self._logger.is_info_enabled():
+                self.info_stream(f"Activating detector {self._detector_id}")
             # In production: microscope.imaging.set_active_device(detector_id)
         elif not value and self._active:
-            self.info_stream(f"Deactivating detector {self._detector_id}")
+            if self._logger.is_info_enabled():
+                self.info_stream(f"Deactivating detector {self._detector_id}")
         self._active = value
     
     @attribute(
@@ -92,14 +323,18 @@ class DetectorDevice(Device):
         if value <= 0:
             raise ValueError("Dwell time must be positive")
         self._dwell_time = value
-        self.info_stream(f"Detector {self._detector_id} dwell_time set to {value}s")
+        if self._logger.is_info_enabled():
+            self.info_stream(f"Detector {self._detector_id} dwell_time set to {value}s")
     
     @attribute(
         label="Resolution",
         dtype=int,
         access=AttrWriteType.READ_WRITE,
         unit="px",
-        doc="Image resolution (width and height in pixels)"
+        min_value=1,
+        max_value=4096,
+        doc="Image resolution (width and height in pixels, 1-4096). "
+            "The range is enforced by Tango before write_resolution runs"
     )
     def resolution(self):
         return self._resolution
@@ -111,10 +346,9 @@ class DetectorDevice(Device):
                 f"Cannot set resolution: detector {self._detector_id} is not active. "
                 "Set active = True first."
             )
-        if value <= 0 or value > 4096:
-            raise ValueError("Resolution must be between 1 and 4096")
         self._resolution = value
-        self.info_stream(f"Detector {self._detector_id} resolution set to {value}px")
+        if self._logger.is_info_enabled():
+            self.info_stream(f"Detector {self._detector_id} resolution set to {value}px")
     
     @attribute(
         label="Detector ID",
@@ -129,13 +363,14 @@ class DetectorDevice(Device):
     # Commands
     # ========================================================================
     
-    @command(dtype_out=[float], doc_out="Flattened image array")
+    @command(dtype_out=(np.uint8,), doc_out="Flattened uint8 image array")
     def GetImage(self):
         """
         Acquire an image from this detector.
         
         Returns:
-            Flattened 1D array of image data (reshape to resolution x resolution)
+            Flattened 1D uint8 array of image data (reshape to resolution x
+            resolution; use image.astype(float) for float processing)
         
         Raises:
             Exception: If detector is not active or acquisition fails
@@ -146,76 +381,47 @@ class DetectorDevice(Device):
                 "Set active = True first."
             )
         
+        # Settings of this acquisition, even if attributes change meanwhile
+        resolution = self._resolution
+        dwell_time = self._dwell_time
+        
         # Validate acquisition time
-        total_time = self._dwell_time * self._resolution * self._resolution
+        total_time = dwell_time * resolution * resolution
         if total_time > 600:
             raise Exception(
                 f"Acquisition too long: {total_time:.1f}s (max 600s). "
                 "Reduce dwell_time or resolution."
             )
         
-        try:
-            # Set state to RUNNING
-            self.set_state(DevState.RUNNING)
-            self.set_status(
-                f"Acquiring {self._resolution}x{self._resolution} image "
-                f"from detector {self._detector_id}..."
-            )
-            self.info_stream(
-                f"Acquiring: detector {self._detector_id}, "
-                f"{self._resolution}x{self._resolution}, "
-                f"{self._dwell_time}s/pixel, total={total_time:.1f}s"
-            )
-            
-            # Simulate acquisition time (in production: actual AutoScript call)
-            time.sleep(2)  # Reduced for demo
-            
-            # Generate simulated image
-            # In production: microscope.imaging.grab_frame()
-            image = self._generate_simulated_image()
-            flattened_image = image.flatten()
+        with self._fault_on_error("Image acquisition failed"):
+            if self.report_running_state:
+                self._change_state(
+                    DevState.RUNNING,
+                    f"Acquiring {resolution}x{resolution} image "
+                    f"from detector {self._detector_id}..."
+                )
             
-            # Return to STANDBY state
-            self.set_state(DevState.STANDBY)
-            self.set_status(f"Detector {self._detector_id} ready.")
+            # Hand the acquisition to the worker process and wait for the frame
+            with self._acquire_lock:
+                self._cmd_q.put(("acquire", {"resolution": resolution}))
+                image = self._wait_for_frame()
+            if isinstance(image, Exception):
+                raise image
+            # Freshly unpickled and C-contiguous: ravel() is a view, no copy
+            flattened_image = image.ravel()
             
-            self.info_stream(
-                f"Returning {len(flattened_image)} pixels "
-                f"(reshape to {self._resolution}x{self._resolution})"
-            )
+            self._change_state(DevState.STANDBY, f"Detector {self._detector_id} ready.")
+            if self._logger.is_info_enabled():
+                self.info_stream(
+                    f"Acquired: detector {self._detector_id}, "
+                    f"{resolution}x{resolution}, "
+                    f"{dwell_time}s/pixel, total={total_time:.1f}s; "
+                    f"returning {len(flattened_image)} pixels"
+                )
             return flattened_image
-            
-        except Exception as e:
-            self.set_state(DevState.FAULT)
-            error_msg = f"Image acquisition failed: {str(e)}"
-            self.set_status(error_msg)
-            self.error_stream(error_msg)
-            raise
-    
-    def _generate_simulated_image(self):
-        """Generate a simulated image (digital twin mode)."""
-        # Create different patterns for different detectors
-        if self._detector_id == 'A':
-            # Gradient pattern
-            x = np.linspace(0, 1, self._resolution)
-            y = np.linspace(0, 1, self._resolution)
-            X, Y = np.meshgrid(x, y)
-            image = (X + Y) / 2 * 255
-        elif self._detector_id == 'B':
-            # Circular pattern
-            x = np.linspace(-1, 1, self._resolution)
-            y = np.linspace(-1, 1, self._resolution)
-            X, Y = np.meshgrid(x, y)
-            R = np.sqrt(X**2 + Y**2)
-            image = (1 - np.clip(R, 0, 1)) * 255
-        else:  # C
-            # Random noise
-            image = np.random.rand(self._resolution, self._resolution) * 255
-        
-        return image.astype(np.float64)
 
 
-class MicroscopeSystemDevice(Device):
+class MicroscopeSystemDevice(_StateMixin, Device):
     """
     Main microscope system coordinator device.
     
@@ -226,15 +432,28 @@ class MicroscopeSystemDevice(Device):
     between detector devices.
     """
     
+    # Same green mode as DetectorDevice: both classes share one server process
+    green_mode = GreenMode.Gevent
+    
+    simulation_seed = device_property(
+        dtype=int,
+        default_value=-1,
+        doc="Seed for the simulated data, for reproducible runs; -1 (default) seeds from OS entropy",
+    )
     
     def init_device(self):
         """Initialize the microscope system."""
+        super().init_device()  # reads the device properties
+
         # Microscope connection (in production: SdbMicroscopeClient)
         self._microscope = None
         self._connection_string = ""
+        self._logger = self.get_logger()
+
+        # Random source for the simulated stage readout
+        self._rng = np.random.default_rng(None if self.simulation_seed < 0 else self.simulation_seed)
         
-        self.set_state(DevState.INIT)
-        self.set_status("Microscope system initialized. Use Connect command.")
+        self._change_state(DevState.INIT, "Microscope system initialized. Use Connect command.")
         self.info_stream("Microscope system initialized")
     
     # ========================================================================
@@ -280,14 +499,9 @@ class MicroscopeSystemDevice(Device):
             Connection status message
         """
         # Parse connection string
-        if ":" in connection_string:
-            host, port = connection_string.split(":")
-            port = int(port)
-        else:
-            host = connection_string
-            port = 9001
+        host, port = _parse_conn(connection_string)
         
-        try:
+        with self._fault_on_error("Failed to connect"):
             self.info_stream(f"Connecting to microscope at {host}:{port}...")
             
             # In production: self._microscope = SdbMicroscopeClient()
@@ -296,22 +510,14 @@ class MicroscopeSystemDevice(Device):
             self._connection_string = f"{host}:{port}"
             
             # Update state
-            self.set_state(DevState.ON)
             msg = f"Connected to microscope at {host}:{port}"
-            self.set_status(msg)
+            self._change_state(DevState.ON, msg)
             
             self.info_stream(msg)
             return msg
-            
-        except Exception as e:
-            self.set_state(DevState.FAULT)
-            error_msg = f"Failed to connect: {str(e)}"
-            self.set_status(error_msg)
-            self.error_stream(error_msg)
-            raise
     
     @command(
-        dtype_out=[float],
+        dtype_out=DevVarDoubleArray,
         doc_out="Stage position [x, y, z, tilt, rotation]"
     )
     def GetStage(self):
@@ -319,21 +525,16 @@ class MicroscopeSystemDevice(Device):
         Get current stage position.
         
         Returns:
-            List of 5 floats: [x, y, z, tilt, rotation]
+            Array of 5 floats: [x, y, z, tilt, rotation]
         """
         if self._microscope is None:
             raise Exception("Microscope not connected. Use Connect command first.")
         
-        try:
-            # In production: self._microscope.specimen.stage.get_position()
-            positions = [np.random.uniform(-10, 10) for _ in range(5)]
+        # In production: self._microscope.specimen.stage.get_position()
+        positions = self._rng.uniform(-10.0, 10.0, size=5)
+        if self._logger.is_info_enabled():
             self.info_stream(f"Stage position: {positions}")
-            return positions
-            
-        except Exception as e:
-            error_msg = f"Failed to get stage position: {str(e)}"
-            self.error_stream(error_msg)
-            raise
+        return positions
 
 
 if __name__ == "__main__":